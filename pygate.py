@@ -95,6 +95,14 @@ Configuration:
 
     try:
         gateway = Gateway(args.config, load_spam_filter=load_spam_filter)
+    except configparser.Error as e:
+        # A required option is missing or malformed; --check reports it as a
+        # failed check rather than an initialization error
+        if args.check:
+            print(f"Configuration check failed: {e}")
+        else:
+            print(f"Error initializing gateway: {e}")
+        sys.exit(1)
     except Exception as e:
         print(f"Error initializing gateway: {e}")
         sys.exit(1)
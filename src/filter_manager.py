@@ -15,13 +15,18 @@ import configparser
 import re
 import sys
 import os
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 import email
 import email.header
 from email.message import Message
 from datetime import datetime, timedelta
 import time
 import shutil
+import itertools
+from collections import Counter
+from contextlib import closing
+from functools import lru_cache
+from operator import itemgetter
 
 # Use custom NNTP client instead of deprecated nntplib
 try:
@@ -37,6 +42,55 @@ except ImportError:
     nntplib_NNTP_SSL = nntplib.NNTP_SSL
     nntplib_NNTPError = nntplib.NNTPError
 
+# Tokenizer for subject words in bulk filter suggestions (1-2 letter words are skipped)
+_WORD_RE = re.compile(r'\b\w{3,}\b')
+
+# Common subject words that make poor filter patterns
+_STOPWORDS = frozenset((
+    'the', 'and', 'for', 'with', 'this', 'that', 'from', 'have', 'are', 'but',
+    'not', 'you', 'your', 'was', 'were', 'has', 'had', 'its', 'all', 'any',
+    'can', 'will', 'what', 'when', 'who', 'why', 'how', 'about', 'into',
+    'than', 'then', 'them', 'they', 'there', 'their', 'been', 'just', 'out',
+    'our', 'off', 'some', 'more', 'also', 'only', 'over', 'does', 'did',
+))
+
+# Bulk filter runs escape the same senders/words/newsgroups repeatedly
+_escape = lru_cache(maxsize=4096)(re.escape)
+
+
+def _iter_retrieve(conn, method: str, message_specs: Iterable) -> Iterable[Tuple[object, Optional[List[bytes]]]]:
+    """Yield (message_spec, lines) for each spec using conn.head/conn.article
+
+    The custom client pipelines these commands (iter_heads/iter_articles);
+    with nntplib they are sent one at a time. lines is None for articles
+    the server could not return.
+    """
+    pipelined = getattr(conn, f'iter_{method}s', None)
+    if pipelined is not None:
+        for spec, resp, lines in pipelined(message_specs):
+            yield spec, lines
+        return
+
+    retrieve = getattr(conn, method)
+    for spec in message_specs:
+        try:
+            resp, info = retrieve(str(spec))
+        except nntplib_NNTPError:
+            yield spec, None
+        else:
+            yield spec, info.lines
+
+
+def _parse_ddmmyyyy(date_str: str) -> datetime:
+    """Parse a DD-MM-YYYY date; raises ValueError if malformed."""
+    day, month, year = date_str.split('-')
+    # As strict as strptime('%d-%m-%Y'): int() alone would take "25" as a
+    # year or allow whitespace and signs around the numbers
+    if not (1 <= len(day) <= 2 and 1 <= len(month) <= 2 and len(year) == 4
+            and (day + month + year).isdigit()):
+        raise ValueError(f"Invalid DD-MM-YYYY date: {date_str!r}")
+    return datetime(int(year), int(month), int(day))
+
 
 class FilterManager:
     """Manages filter.cfg updates by analyzing NNTP messages."""
@@ -89,15 +143,74 @@ class FilterManager:
             print(f"Failed to connect to NNTP server: {e}")
             return False
 
-    def disconnect(self) -> None:
-        """Disconnect from the NNTP server."""
+    def disconnect(self, send_quit: bool = True) -> None:
+        """Disconnect from the NNTP server.
+
+        Pass send_quit=False when the connection timed out or pipelined
+        responses may still be in flight, so no QUIT reply is waited for.
+        """
         if self.nntp_conn:
             try:
-                self.nntp_conn.quit()
+                if send_quit:
+                    self.nntp_conn.quit()
+                elif hasattr(self.nntp_conn, 'close'):
+                    self.nntp_conn.close()
+                else:
+                    # nntplib has no public close that skips QUIT
+                    self.nntp_conn._close()
             except:
                 pass
             self.nntp_conn = None
 
+    def _reconnect_group(self, newsgroup: str) -> bool:
+        """Replace the connection and reselect newsgroup after a retrieval error
+
+        Responses to pipelined commands may still be in flight, so the old
+        connection is closed without QUIT and never reused.
+        """
+        self.disconnect(send_quit=False)
+        if not self.connect_to_server():
+            return False
+
+        try:
+            self.nntp_conn.group(newsgroup)
+            return True
+        except Exception as e:
+            print(f"Error selecting newsgroup {newsgroup}: {e}")
+            return False
+
+    def _retrieve_messages(self, newsgroup: str, method: str, message_specs: Iterable) -> Iterable[Tuple[object, Optional[List[bytes]]]]:
+        """Yield (message_spec, lines) for each spec in newsgroup, pipelined
+
+        A message that fails to download is skipped and the connection is
+        replaced before carrying on with the rest. If the caller stops early,
+        the connection is replaced too, so wrap the generator in closing().
+        """
+        specs = list(message_specs)
+        pos = 0
+        while pos < len(specs):
+            retrieved = _iter_retrieve(self.nntp_conn, method, specs[pos:])
+            try:
+                for spec, lines in retrieved:
+                    pos += 1
+                    yield spec, lines
+                return
+            except Exception as e:
+                if pos < len(specs):
+                    print(f"Error retrieving message {specs[pos]}: {e}")
+                    pos += 1
+                if not self._reconnect_group(newsgroup):
+                    return
+            except GeneratorExit:
+                retrieved.close()
+                self._reconnect_group(newsgroup)
+                raise
+            except BaseException:
+                # Interrupted (e.g. Ctrl-C) with responses still in flight
+                retrieved.close()
+                self.disconnect(send_quit=False)
+                raise
+
     def normalize_message_id(self, message_id: str) -> str:
         """Normalize message ID format for NNTP retrieval."""
         message_id = message_id.strip()
@@ -457,56 +570,57 @@ class FilterManager:
                 scan_start = max(int(first), int(last) - 500)
                 print(f"Scanning last 500 messages ({scan_start}-{last})...")
 
-            for msg_num in range(int(last), scan_start, -1):
-                try:
-                    # Get headers only first
-                    resp, info = self.nntp_conn.head(str(msg_num))
-                    header_lines = [line.decode('utf-8', errors='replace') for line in info.lines]
-                    header_text = '\n'.join(header_lines)
-
-                    # Parse headers to get date
-                    msg = email.message_from_string(header_text)
-                    date_header = msg.get('Date')
-                    if not date_header:
+            # Get headers only first; HEAD commands are pipelined
+            scan_range = range(int(last), scan_start, -1)
+            with closing(self._retrieve_messages(newsgroup, 'head', scan_range)) as retrieved:
+                for msg_num, lines in retrieved:
+                    if lines is None:
                         continue
-
-                    # Parse date
                     try:
-                        msg_date = email.utils.parsedate_to_datetime(date_header)
-                        # Strip timezone info to make comparison work
-                        if msg_date.tzinfo is not None:
-                            msg_date = msg_date.replace(tzinfo=None)
+                        header_lines = [line.decode('utf-8', errors='replace') for line in lines]
+                        header_text = '\n'.join(header_lines)
 
-                        # Convert to date-only for comparison (ignore time)
-                        msg_date_only = msg_date.date()
-                        start_date_only = start_date.date()
-                        end_date_only = end_date.date()
+                        # Parse headers to get date
+                        msg = email.message_from_string(header_text)
+                        date_header = msg.get('Date')
+                        if not date_header:
+                            continue
 
-                    except Exception as e:
-                        continue
+                        # Parse date
+                        try:
+                            msg_date = email.utils.parsedate_to_datetime(date_header)
+                            # Strip timezone info to make comparison work
+                            if msg_date.tzinfo is not None:
+                                msg_date = msg_date.replace(tzinfo=None)
 
-                    # Check if message is in our date range (date-only comparison)
-                    if start_date_only <= msg_date_only <= end_date_only:
-                        subject = self.decode_header(msg.get('Subject', 'No Subject'))
-                        from_header = self.decode_header(msg.get('From', 'Unknown'))
+                            # Convert to date-only for comparison (ignore time)
+                            msg_date_only = msg_date.date()
+                            start_date_only = start_date.date()
+                            end_date_only = end_date.date()
 
-                        messages.append({
-                            'number': msg_num,
-                            'date': msg_date,
-                            'subject': subject,
-                            'from': from_header,
-                            'message_id': msg.get('Message-ID', ''),
-                            'headers': msg
-                        })
+                        except Exception as e:
+                            continue
 
-                        print(f"Found: {msg_date.strftime('%d-%m-%Y %H:%M')} - {subject[:60]}...")
+                        # Check if message is in our date range (date-only comparison)
+                        if start_date_only <= msg_date_only <= end_date_only:
+                            subject = self.decode_header(msg.get('Subject', 'No Subject'))
+                            from_header = self.decode_header(msg.get('From', 'Unknown'))
 
-                except nntplib_NNTPError:
-                    continue
-                except Exception as e:
-                    continue
+                            messages.append({
+                                'number': msg_num,
+                                'date': msg_date,
+                                'subject': subject,
+                                'from': from_header,
+                                'message_id': msg.get('Message-ID', ''),
+                                'headers': msg
+                            })
+
+                            print(f"Found: {msg_date.strftime('%d-%m-%Y %H:%M')} - {subject[:60]}...")
+
+                    except Exception as e:
+                        continue
 
-            messages.sort(key=lambda x: x['date'], reverse=True)
+            messages.sort(key=itemgetter('date'), reverse=True)
             print(f"\nFound {len(messages)} messages in date range")
             return messages
 
@@ -621,20 +735,24 @@ class FilterManager:
 
         # Collect all message data
         all_headers = []
-        for msg_info in messages:
-            try:
-                # Get full message content
-                resp, info = self.nntp_conn.article(str(msg_info['number']))
-                message_lines = [line.decode('utf-8', errors='replace') for line in info.lines]
-                message_text = '\n'.join(message_lines)
-                message = email.message_from_string(message_text)
+        # Get full message content; ARTICLE commands are pipelined
+        msg_infos = {msg_info['number']: msg_info for msg_info in messages}
+        with closing(self._retrieve_messages(newsgroup, 'article', msg_infos)) as retrieved:
+            for number, lines in retrieved:
+                if lines is None:
+                    print(f"Error analyzing message {number}: article not available")
+                    continue
+                try:
+                    message_lines = [line.decode('utf-8', errors='replace') for line in lines]
+                    message_text = '\n'.join(message_lines)
+                    message = email.message_from_string(message_text)
 
-                headers = self.analyze_message(message)
-                all_headers.append((headers, msg_info))
+                    headers = self.analyze_message(message)
+                    all_headers.append((headers, msg_infos[number]))
 
-            except Exception as e:
-                print(f"Error analyzing message {msg_info['number']}: {e}")
-                continue
+                except Exception as e:
+                    print(f"Error analyzing message {number}: {e}")
+                    continue
 
         print(f"\nAnalyzed {len(all_headers)} messages")
 
@@ -658,7 +776,7 @@ class FilterManager:
             sender_counts[sender] = sender_counts.get(sender, 0) + 1
 
         # Sort senders by count (most frequent first)
-        sorted_senders = sorted(sender_counts.items(), key=lambda x: x[1], reverse=True)
+        sorted_senders = sorted(sender_counts.items(), key=itemgetter(1), reverse=True)
 
         # Display subjects with paging
         self._display_paginated_list(
@@ -756,18 +874,36 @@ class FilterManager:
                 # Empty input means continue to next section
                 break
 
-    def generate_bulk_filters(self, newsgroup: str, all_headers: List[Tuple[Dict, Dict]]) -> List[Tuple[str, str, str]]:
-        """Generate filter rules for bulk messages."""
+    def _add_phrase_filter(self, filters: List[Tuple[str, str, str]], subjects: List[str]) -> None:
+        """Prompt for a subject phrase and append a filter rule for it."""
+        print(f"\nOriginal subject: {subjects[0]}")
+        phrase = input("Enter phrase to filter on (e.g., 'sovereign citizens'): ").strip()
+        if phrase:
+            filters.append(('Subject', f'(?i).*{_escape(phrase)}', f'Contains phrase: {phrase}'))
+            print(f"Added phrase filter for: {phrase}")
+        else:
+            print("No phrase entered, skipping")
+
+    def _append_word_filters(self, filters: List[Tuple[str, str, str]], words: List[Tuple[str, int]],
+                             show_counts: bool = False) -> None:
+        """Append a case-insensitive Subject word filter for each (word, count) pair."""
+        if show_counts:
+            filters.extend(('Subject', f'(?i).*\\b{_escape(word)}\\b', f'Contains word: {word} ({count} time{"s" if count > 1 else ""})')
+                           for word, count in words)
+        else:
+            filters.extend(('Subject', f'(?i).*\\b{_escape(word)}\\b', f'Contains word: {word}')
+                           for word, _ in words)
+
+    def generate_bulk_filters(self, newsgroup: str, all_headers: Iterable[Tuple[Dict, Dict]]) -> List[Tuple[str, str, str]]:
+        """Generate filter rules for bulk messages.
+
+        all_headers is consumed at most once, by the selected option only,
+        so a generator can be passed instead of a fully built list.
+        """
         print(f"\nGenerating filter suggestions...")
 
         filters = []
 
-        # Option 1: Block all messages from common senders
-        from_headers = [headers['From'] for headers, _ in all_headers if 'From' in headers]
-        sender_counts = {}
-        for sender in from_headers:
-            sender_counts[sender] = sender_counts.get(sender, 0) + 1
-
         print("\nFilter options:")
         print("1. Block by sender (From header)")
         print("2. Block by subject patterns")
@@ -777,12 +913,15 @@ class FilterManager:
         choice = input("Select option (1-4): ").strip()
 
         if choice == '1':
+            # Block all messages from common senders
+            from_headers = [headers['From'] for headers, _ in all_headers if 'From' in headers]
+            sender_counts = Counter(from_headers)
             if not sender_counts:
                 print("No senders found")
             else:
                 # For single or multiple messages, always offer to block senders
                 for sender, count in sender_counts.items():
-                    escaped_sender = re.escape(sender)
+                    escaped_sender = _escape(sender)
                     filters.append(('From', f'.*{escaped_sender}', f'Block sender: {sender} ({count} message{"s" if count > 1 else ""})'))
                     print(f"Added filter to block: {sender}")
 
@@ -790,90 +929,70 @@ class FilterManager:
             # Look for common subject patterns
             subjects = [headers['Subject'] for headers, _ in all_headers if 'Subject' in headers]
             # Find common words in subjects
-            all_words = []
-            for subject in subjects:
-                words = re.findall(r'\b\w+\b', subject.lower())
-                all_words.extend(words)
-
-            word_counts = {}
-            for word in all_words:
-                if len(word) > 3:  # Skip short words
-                    word_counts[word] = word_counts.get(word, 0) + 1
+            # Already-lowercase subjects are tokenized as-is to skip the copy
+            words = itertools.chain.from_iterable(
+                _WORD_RE.findall(subject if subject.islower() else subject.lower())
+                for subject in subjects
+            )
+            word_counts = Counter(word for word in words if word not in _STOPWORDS)
 
             print("\nCommon words in subjects:")
 
             if not word_counts:
-                print("No significant words found in subjects (words must be > 3 characters)")
+                print("No significant words found in subjects (common words and words under 3 characters are skipped)")
                 filters.append(('Subject', '.*', 'Block all subjects (no specific patterns found)'))
             else:
                 # Show all words and let user choose, or auto-suggest based on frequency
-                sorted_words = sorted(word_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+                sorted_words = word_counts.most_common(10)
 
                 if len(subjects) == 1:
                     # Single message - show all words and let user pick
                     print("Available words from the subject:")
-                    for i, (word, count) in enumerate(sorted_words, 1):
-                        print(f"{i:2d}. {word} ({count} time{'s' if count > 1 else ''})")
+                    print('\n'.join(
+                        f"{i:2d}. {word} ({count} time{'s' if count > 1 else ''})"
+                        for i, (word, count) in enumerate(sorted_words, 1)
+                    ))
 
                     print(f"{len(sorted_words) + 1:2d}. Create phrase filter (multiple words together)")
 
                     word_choice = input("\nSelect word numbers (comma-separated), 'all', or phrase option: ").strip()
                     if word_choice.lower() == 'all':
-                        for word, count in sorted_words:
-                            filters.append(('Subject', f'(?i).*\\b{re.escape(word)}\\b', f'Contains word: {word}'))
+                        self._append_word_filters(filters, sorted_words)
                     elif word_choice == str(len(sorted_words) + 1):
                         # Phrase filter option
-                        print(f"\nOriginal subject: {subjects[0]}")
-                        phrase = input("Enter phrase to filter on (e.g., 'sovereign citizens'): ").strip()
-                        if phrase:
-                            escaped_phrase = re.escape(phrase)
-                            filters.append(('Subject', f'(?i).*{escaped_phrase}', f'Contains phrase: {phrase}'))
-                            print(f"Added phrase filter for: {phrase}")
-                        else:
-                            print("No phrase entered, skipping")
+                        self._add_phrase_filter(filters, subjects)
                     elif word_choice:
                         try:
                             indices = [int(x.strip()) - 1 for x in word_choice.split(',')]
                             phrase_idx = len(sorted_words)  # The phrase option index
 
-                            if phrase_idx in [int(x.strip()) - 1 for x in word_choice.split(',')]:
+                            if phrase_idx in indices:
                                 # User selected phrase option along with word numbers
-                                print(f"\nOriginal subject: {subjects[0]}")
-                                phrase = input("Enter phrase to filter on (e.g., 'sovereign citizens'): ").strip()
-                                if phrase:
-                                    escaped_phrase = re.escape(phrase)
-                                    filters.append(('Subject', f'(?i).*{escaped_phrase}', f'Contains phrase: {phrase}'))
-                                    print(f"Added phrase filter for: {phrase}")
-
-                            # Process individual word selections
-                            for idx in indices:
-                                if 0 <= idx < len(sorted_words):
-                                    word, count = sorted_words[idx]
-                                    filters.append(('Subject', f'(?i).*\\b{re.escape(word)}\\b', f'Contains word: {word}'))
+                                self._add_phrase_filter(filters, subjects)
+
+                            # Process individual word selections (deduplicated, in range, in order)
+                            valid_indices = [idx for idx in dict.fromkeys(indices) if 0 <= idx < len(sorted_words)]
+                            self._append_word_filters(filters, [sorted_words[idx] for idx in valid_indices])
 
                         except ValueError:
                             print("Invalid selection, using all words")
-                            for word, count in sorted_words:
-                                filters.append(('Subject', f'(?i).*\\b{re.escape(word)}\\b', f'Contains word: {word}'))
+                            self._append_word_filters(filters, sorted_words)
                 else:
                     # Multiple messages - use words that appear more than once
                     for word, count in sorted_words:
-                        if count > 1:
-                            filters.append(('Subject', f'(?i).*\\b{re.escape(word)}\\b', f'Contains word: {word} ({count} times)'))
-                        else:
+                        if count == 1:
                             print(f"Word '{word}' appears only once, skipping")
+                    self._append_word_filters(filters, [item for item in sorted_words if item[1] > 1], show_counts=True)
 
                     if not filters:
                         print("No words appear multiple times. Showing all significant words:")
-                        for word, count in sorted_words:
-                            filters.append(('Subject', f'(?i).*\\b{re.escape(word)}\\b', f'Contains word: {word} ({count} time{"s" if count > 1 else ""})'))
-                            print(f"Added filter for: {word}")
+                        self._append_word_filters(filters, sorted_words, show_counts=True)
+                        print('\n'.join(f"Added filter for: {word}" for word, _ in sorted_words))
 
         elif choice == '3':
-            # Block by newsgroup and date range
-            start_date = min(msg_info['date'] for _, msg_info in all_headers)
-            end_date = max(msg_info['date'] for _, msg_info in all_headers)
-            filters.append(('Newsgroups', f'(?i).*{re.escape(newsgroup)}', f'Block {newsgroup} (bulk spam detected)'))
+            # Block by newsgroup (filter rules have no date field, so the
+            # selected date range only determines which messages were analyzed)
+            filters.append(('Newsgroups', f'(?i).*{_escape(newsgroup)}', f'Block {newsgroup} (bulk spam detected)'))
 
         return filters
 
@@ -954,7 +1073,7 @@ class FilterManager:
         start_date_str = input("Start date: ").strip()
 
         try:
-            start_date = datetime.strptime(start_date_str, '%d-%m-%Y')
+            start_date = _parse_ddmmyyyy(start_date_str)
         except ValueError:
             print("Invalid date format")
             return
@@ -962,7 +1081,7 @@ class FilterManager:
         end_date_str = input("End date (press Enter for today): ").strip()
         if end_date_str:
             try:
-                end_date = datetime.strptime(end_date_str, '%d-%m-%Y')
+                end_date = _parse_ddmmyyyy(end_date_str)
             except ValueError:
                 print("Invalid date format")
                 return
@@ -994,9 +1113,7 @@ class FilterManager:
         # Show preview
         print("\nGenerated filter rules:")
         print("-" * 40)
-        for field, pattern, description in filters:
-            print(f"# {description}")
-            print(f"^{field}:{pattern}")
+        print('\n'.join([f"# {description}\n^{field}:{pattern}" for field, pattern, description in filters]))
 
         confirm = input(f"\nAdd these {len(filters)} filters to filter.cfg? (y/n): ")
         if confirm.lower() == 'y':
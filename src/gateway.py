@@ -5,12 +5,24 @@ Handles the main gateway operations between FidoNet and NNTP
 """
 
 import os
+import re
 import sys
+import time
+import zlib
+import shutil
+import socket
+import platform
 import logging
 import configparser
-from pathlib import Path
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+import queue
+import threading
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Any, Tuple, Union
+from datetime import datetime, timezone, timedelta
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from secrets import token_hex
 
 from .nntp_module import NNTPModule
 from .fidonet_module import FidoNetModule
@@ -19,12 +31,131 @@ from .spam_filter import SpamFilterModule
 from .hold_module import MessageHoldModule
 
 
+# One areas file entry: "newsgroup_name: low-high"
+_AREAS_LINE_RE = re.compile(r'^[ \t]*([^\s#:]+)[ \t]*:[ \t]*(\d+)[ \t]*-[ \t]*(\d+)[ \t]*$', re.M)
+# Any line that is neither blank nor a comment
+_AREAS_DATA_LINE_RE = re.compile(r'^[^\S\n]*[^\s#]', re.M)
+
+# Per-area packet statistics: index into the [gated, filtered, failed] list
+_GATED, _FILTERED, _FAILED = range(3)
+
+# FTS-5003.001 CHRS identifiers -> Python codecs
+_CHARSET_MAP = {
+    # Level 2 character sets (eight-bit, ASCII based)
+    'CP437': 'cp437',      # IBM codepage 437 (DOS Latin US)
+    'CP850': 'cp850',      # IBM codepage 850 (DOS Latin 1)
+    'CP852': 'cp852',      # IBM codepage 852 (DOS Latin 2)
+    'CP866': 'cp866',      # IBM codepage 866 (Cyrillic Russian)
+    'CP848': 'cp1125',     # IBM codepage 848 (Cyrillic Ukrainian) - closest match
+    'CP1250': 'cp1250',    # Windows, Eastern Europe
+    'CP1251': 'cp1251',    # Windows, Cyrillic
+    'CP1252': 'cp1252',    # Windows, Western Europe
+    'CP10000': 'mac-roman', # Macintosh Roman character set
+    'LATIN-1': 'iso-8859-1',  # ISO 8859-1 (Western European)
+    'LATIN-2': 'iso-8859-2',  # ISO 8859-2 (Eastern European)
+    'LATIN-5': 'iso-8859-9',  # ISO 8859-9 (Turkish)
+    'LATIN-9': 'iso-8859-15', # ISO 8859-15 (Western Europe with EURO sign)
+    # Level 4
+    'UTF-8': 'utf-8',      # UTF-8 encoding for the Unicode character set
+    # Level 1 (seven-bit) - rarely used but included for completeness
+    'ASCII': 'ascii',      # ISO 646-1 (US ASCII)
+    # Obsolete identifiers that should still be handled
+    'IBMPC': 'cp437',      # IBM PC character sets - treat as CP437
+    '+7_FIDO': 'cp866',    # Synonym for CP866
+    'MAC': 'mac-roman',    # Macintosh character set
+}
+
+# Codec FidoNetModule decodes packet text with; it maps all 256 bytes, so
+# encoding with it recovers the original bytes
+_PACKET_TEXT_CODEC = 'cp437'
+# Source charsets for which convert_text_encoding returns packet text as is
+_PASSTHROUGH_ENCODINGS = frozenset(('utf-8', _PACKET_TEXT_CODEC))
+
+# Characters each eight-bit charset can represent (cp1252 leaves five bytes undefined)
+_CP437_CHARS = frozenset(bytes(range(256)).decode('cp437'))
+_CP1252_CHARS = frozenset(bytes(range(256)).decode('cp1252', errors='ignore'))
+
+# platform.system() names as shown in tearline/TID
+_OS_DISPLAY_NAMES = {'Linux': 'Linux', 'Windows': 'Windows', 'Darwin': 'macOS'}
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_str(date_value: str) -> datetime:
+    """Parse an ISO or RFC 2822 date string (raises ValueError/TypeError on failure)
+
+    Cached because feeds often repeat the same Date header across messages.
+    """
+    # Try parsing ISO format first (common in JSON)
+    if 'T' in date_value or '+' in date_value:
+        # Handle ISO format with T or space
+        if ' ' in date_value and 'T' not in date_value:
+            # Convert space to T for ISO parsing
+            date_value = date_value.replace(' ', 'T', 1)
+
+        if date_value.endswith('+00:00'):
+            return datetime.fromisoformat(date_value)
+        elif 'Z' in date_value:
+            return datetime.fromisoformat(date_value.replace('Z', '+00:00'))
+        else:
+            return datetime.fromisoformat(date_value)
+    else:
+        # Try parsing other common formats
+        return parsedate_to_datetime(date_value)
+
+
+@lru_cache(maxsize=256)
+def _format_tzutc(offset_seconds: int) -> str:
+    """Format a UTC offset in seconds as a FTS-4008 TZUTC value (e.g. 1000, -0500)"""
+    # Convert seconds to hours and minutes; only negative offsets get a sign
+    sign = '-' if offset_seconds < 0 else ''
+    offset_hours, rem = divmod(abs(offset_seconds), 3600)
+    return f"{sign}{offset_hours:02d}{rem // 60:02d}"
+
+
+@lru_cache(maxsize=None)
+def _fixed_timezone(offset_seconds: int) -> timezone:
+    """Fixed-offset timezone for a TZUTC value (bounded: |offset| < 24h or it raises)"""
+    return timezone(timedelta(seconds=offset_seconds))
+
+
+def _crc32_hex(message_id: str) -> str:
+    """CRC32 of a Message-ID as 8 lowercase hex digits, as used in MSGID/REPLY kludges"""
+    # zlib's crc32 is the optimised one (binascii may use its own table loop);
+    # on Python 3 it is already unsigned
+    return f"{zlib.crc32(message_id.encode('utf-8')):08x}"
+
+
+# Replies in one thread keep hashing the same parent Message-ID
+_cached_crc32_hex = lru_cache(maxsize=4096)(_crc32_hex)
+
+
+# Inbound totalling less than this is parsed in process; starting worker
+# processes costs more than parsing a handful of small packets
+_PARSE_POOL_MIN_BYTES = 1 << 20
+
+# FidoNetModule of a parse worker process, created by _init_parse_worker
+_worker_fidonet = None
+
+
+def _init_parse_worker(config) -> None:
+    """Set up a parse worker process once, so packets don't carry the config"""
+    global _worker_fidonet
+    _worker_fidonet = FidoNetModule(config, logging.getLogger('PyGate'))
+
+
+def _parse_packet_file(packet_path: str) -> List[Dict[str, Any]]:
+    """Parse a FidoNet packet in a worker process for Gateway.import_packets"""
+    return _worker_fidonet.parse_packet(packet_path)
+
+
 class Gateway:
     """Core PyGate Gateway class"""
 
     def __init__(self, config_file: str = "pygate.cfg", load_spam_filter: bool = True):
         self.config_file = config_file
-        self.config = configparser.ConfigParser()
+        # The config never uses %(name)s references, so skip interpolation
+        # on every get()
+        self.config = configparser.ConfigParser(interpolation=None)
 
         # Default configuration
         self.setup_default_config()
@@ -42,9 +173,18 @@ class Gateway:
         # Setup logging
         self.setup_logging()
 
+        # Snapshot configuration values used on every packet/message
+        self._cache_config_values()
+
         # Initialize modules
         self.nntp = NNTPModule(self.config, self.logger)
         self.fidonet = FidoNetModule(self.config, self.logger)
+
+        # SEEN-BY/PATH entries (net/node) for outbound echomail
+        self._gateway_seenby = (self.fidonet.format_address_for_seenby(self._gateway_address)
+                                if self._gateway_address else None)
+        self._linked_seenby = (self.fidonet.format_address_for_seenby(self._linked_address)
+                               if self._linked_address else None)
         self.areafix = AreafixModule(self.config, self.logger)
 
         # Lazy load spam filter (not needed for areafix-only operations)
@@ -54,6 +194,10 @@ class Gateway:
 
         self.hold_module = MessageHoldModule(self.config, self.logger)
 
+        # Parsed areas file, reused until the file's mtime changes
+        self._areas_cache = None
+        self._areas_cache_mtime = 0
+
         self.logger.info("PyGate gateway initialized")
 
     @property
@@ -116,6 +260,47 @@ class Gateway:
         print(f"Created default configuration file: {self.config_file}")
         print("Please edit the configuration file with your settings.")
 
+    def _cache_config_values(self):
+        """Snapshot configuration values read in per-packet and per-message paths
+
+        configparser lookups normalise section and option names on every get(),
+        so hot paths read these attributes instead. Call again if self.config
+        changes.
+        """
+        self._inbound_dir = self.config.get('Files', 'inbound_dir')
+        self._areas_file = self.config.get('Files', 'areas_file')
+        self._gateway_address = self.config.get('FidoNet', 'gateway_address')
+        self._linked_address = self.config.get('FidoNet', 'linked_address')
+        self._origin_line = self.config.get('FidoNet', 'origin_line')
+        self._version = self.config.get('Gateway', 'version')
+        os_name = platform.system()
+        self._os_display = _OS_DISPLAY_NAMES.get(os_name, os_name)
+        # Resolved on first generated MSGID rather than at startup
+        self._msgid_hostname = None
+
+        # Static parts of every outbound FidoNet message
+        self._origin_str = f"{self._origin_line} ({self._gateway_address})"
+        self._replyto_str = f"{self._gateway_address} UUCP"
+        self._pid_str = f"PyGate {self._version}"
+        self._tearline_str = self.generate_tearline()
+        self._tid_str = self.generate_tid()
+
+        # TZUTC for naive (local time) message dates. time.daylight only says
+        # the zone has DST at all, so ask for the offset actually in effect now
+        local_offset = int(datetime.now().astimezone().utcoffset().total_seconds())
+        self._local_tzutc_str = _format_tzutc(local_offset)
+        self._local_tz = _fixed_timezone(local_offset)
+
+        # Reverse [Arearemap] (area = newsgroup) for newsgroup -> area lookups;
+        # the first mapping listed for a newsgroup wins
+        self._newsgroup_to_area = {}
+        if self.config.has_section('Arearemap'):
+            try:
+                for fido_area, mapped_newsgroup in self.config.items('Arearemap'):
+                    self._newsgroup_to_area.setdefault(mapped_newsgroup, fido_area.upper())
+            except Exception as e:
+                self.logger.error(f"Error reading Arearemap section: {e}")
+
     def setup_logging(self):
         """Setup logging configuration"""
         log_level = self.config.get('Gateway', 'log_level')
@@ -146,7 +331,7 @@ class Gateway:
             # First, process any approved held messages for NNTP posting
             self.process_approved_messages_to_nntp()
 
-            inbound_dir = self.config.get('Files', 'inbound_dir')
+            inbound_dir = self._inbound_dir
             if not os.path.exists(inbound_dir):
                 self.logger.warning(f"Inbound directory {inbound_dir} does not exist")
                 return True  # Not an error if no inbound
@@ -155,80 +340,90 @@ class Gateway:
             # Track newsgroups that had messages posted (to update newsrc)
             newsgroups_posted = set()
 
-            # Process all .pkt files in inbound
-            for packet_file in Path(inbound_dir).glob("*.pkt"):
-                self.logger.info(f"Processing packet: {packet_file}")
+            # Process all .pkt files in inbound. Parsing is CPU-bound and
+            # independent per packet, so a large inbound is parsed in worker
+            # processes; spam filtering, holding and conversion run here, and
+            # NNTP posting runs on a poster thread so the network wait
+            # overlaps with the next packet's classification.
+            with os.scandir(inbound_dir) as it:
+                packet_entries = [entry for entry in it if entry.is_file() and entry.name.endswith('.pkt')]
+
+            processed_dir = os.path.join(inbound_dir, "processed")
+            bad_dir = os.path.join(inbound_dir, "bad")
+            os.makedirs(processed_dir, exist_ok=True)
+            os.makedirs(bad_dir, exist_ok=True)
+
+            # Bounded so classification cannot run far ahead of posting
+            post_queue = queue.Queue(maxsize=4)
+
+            def post_packets():
+                nonlocal packets_processed
+                while True:
+                    item = post_queue.get()
+                    if item is None:
+                        break
+                    entry, area_stats, pending = item
+                    try:
+                        self._post_packet_messages(area_stats, pending, newsgroups_posted)
+
+                        # Move processed packet
+                        os.replace(entry.path, os.path.join(processed_dir, entry.name))
+                        packets_processed += 1
 
-                try:
-                    # Parse FidoNet packet
-                    messages = self.fidonet.parse_packet(str(packet_file))
+                    except Exception as e:
+                        self.logger.error(f"Error processing {entry.path}: {e}")
+                        self._move_to_bad(entry, bad_dir)
 
-                    # Track messages by area
-                    area_stats = {}
-                    packet_areafix = 0
+            poster = threading.Thread(target=post_packets, name="PyGate-poster")
 
-                    for message in messages:
-                        # Check if it's an areafix message
-                        if self.areafix.is_areafix_message(message):
-                            self.areafix.process_areafix_message(message)
-                            packet_areafix += 1
-                        else:
-                            area = message.get('area', 'NETMAIL')
-
-                            # Initialize area stats if not exists
-                            if area not in area_stats:
-                                area_stats[area] = {'gated': 0, 'filtered': 0, 'failed': 0}
-
-                            # Apply spam filter
-                            if not self.spam_filter.is_spam(message):
-                                # Load area configuration (used for both holding and gating)
-                                areas = self.load_areas_config()
-                                area_config = areas.get(area, {'newsgroup': area.lower()})
-
-                                # Check if message should be held for review (FidoNet to NNTP direction)
-                                if self.hold_module.should_hold_message(message, area):
-                                    # Hold the original FidoNet message for review
-                                    hold_id = self.hold_module.hold_message(message, area, direction="nntp")
-                                    if hold_id:
-                                        self.logger.info(f"FidoNet message held for review: {hold_id}")
-                                    # Count as filtered since it's not being posted immediately
-                                    area_stats[area]['filtered'] += 1
-                                else:
-                                    # Gate to NNTP
-                                    nntp_message = self.convert_fido_to_nntp(message, area_config)
-                                    success = self.nntp.post_message(nntp_message)
-                                    if success:
-                                        area_stats[area]['gated'] += 1
-                                        # Track the newsgroup for newsrc update
-                                        newsgroup = area_config.get('newsgroup')
-                                        if newsgroup:
-                                            newsgroups_posted.add(newsgroup)
-                                    else:
-                                        area_stats[area]['failed'] += 1
-                            else:
-                                area_stats[area]['filtered'] += 1
+            try:
+                inbound_bytes = sum(entry.stat().st_size for entry in packet_entries)
+            except OSError:
+                inbound_bytes = 0
+
+            # A single worker would only serialise the parses elsewhere
+            max_workers = min(len(packet_entries), os.cpu_count() or 1)
+            executor = None
+            if max_workers > 1 and inbound_bytes >= _PARSE_POOL_MIN_BYTES:
+                executor = ProcessPoolExecutor(max_workers=max_workers,
+                                               initializer=_init_parse_worker,
+                                               initargs=(self.config,))
+            try:
+                if executor is not None:
+                    parse_jobs = [executor.submit(_parse_packet_file, entry.path)
+                                  for entry in packet_entries]
+                else:
+                    parse_jobs = [None] * len(packet_entries)
 
-                    # Log summary for each area in this packet
-                    for area, stats in area_stats.items():
-                        if stats['gated'] > 0 or stats['filtered'] > 0 or stats['failed'] > 0:
-                            self.logger.info(f"Area {area}: {stats['gated']} gated, {stats['filtered']} filtered, {stats['failed']} failed")
+                # The first submit forks the workers; start the poster only
+                # now so no fork happens while a second thread holds a lock
+                poster.start()
+                try:
+                    for entry, parse_job in zip(packet_entries, parse_jobs):
+                        self.logger.info("Processing packet: %s", entry.path)
 
-                    # Log areafix messages if any
-                    if packet_areafix > 0:
-                        self.logger.info(f"Areafix: {packet_areafix} processed")
+                        try:
+                            if parse_job is not None:
+                                # Wait for this packet's parse to finish
+                                messages = parse_job.result()
+                            else:
+                                messages = self.fidonet.parse_packet(entry.path)
 
-                    # Move processed packet
-                    processed_dir = Path(inbound_dir) / "processed"
-                    processed_dir.mkdir(exist_ok=True)
-                    packet_file.rename(processed_dir / packet_file.name)
-                    packets_processed += 1
+                            area_stats, pending = self._classify_packet_messages(messages)
 
-                except Exception as e:
-                    self.logger.error(f"Error processing {packet_file}: {e}")
-                    # Move to bad directory
-                    bad_dir = Path(inbound_dir) / "bad"
-                    bad_dir.mkdir(exist_ok=True)
-                    packet_file.rename(bad_dir / packet_file.name)
+                        except Exception as e:
+                            self.logger.error(f"Error processing {entry.path}: {e}")
+                            self._move_to_bad(entry, bad_dir)
+                            continue
+
+                        post_queue.put((entry, area_stats, pending))
+                finally:
+                    # Let the poster drain the queue before touching newsrc
+                    post_queue.put(None)
+                    poster.join()
+            finally:
+                if executor is not None:
+                    executor.shutdown()
 
             # Update newsrc file to prevent re-fetching posted messages
             if newsgroups_posted:
@@ -266,26 +461,128 @@ class Gateway:
             self.logger.error(f"Error during import: {e}")
             return False
 
+        finally:
+            # One NNTP connection serves the whole run; close it once here
+            self.nntp.disconnect()
+
+    def _move_to_bad(self, entry: os.DirEntry, bad_dir: str) -> None:
+        """Move a packet that failed to import into the bad directory"""
+        try:
+            os.replace(entry.path, os.path.join(bad_dir, entry.name))
+        except OSError as e:
+            self.logger.error(f"Error moving {entry.path} to {bad_dir}: {e}")
+
+    def _classify_packet_messages(self, messages: List[Dict[str, Any]]) -> Tuple[Dict[str, List[int]], List[Tuple[str, Dict[str, Any], Dict[str, Any]]]]:
+        """Classify the messages of one inbound packet and handle everything except posting
+
+        Returns the per-area stats so far and the converted messages still to be
+        posted, as (area, area_config, nntp_message) tuples.
+        """
+        # Area configuration (used for both holding and gating)
+        areas = self._get_areas_cached()
+
+        # Phase 1: classify every message before acting on any of them
+        areafix_messages = []
+        to_filter = []
+        for message in messages:
+            if self.areafix.is_areafix_message(message):
+                areafix_messages.append(message)
+            else:
+                to_filter.append(message)
+
+        spam = []
+        to_hold = []
+        to_gate = []
+        spam_flags = self.spam_filter.is_spam_batch(to_filter)
+        for message, is_spam in zip(to_filter, spam_flags):
+            area = message.get('area', 'NETMAIL')
+            if is_spam:
+                spam.append(message)
+            elif self.hold_module.should_hold_message(message, area):
+                # Held for review (FidoNet to NNTP direction)
+                to_hold.append(message)
+            else:
+                to_gate.append(message)
+
+        # Phase 2: handle each group
+        for message in areafix_messages:
+            self.areafix.process_areafix_message(message)
+
+        # Track messages by area
+        # [gated, filtered, failed] per area, indexed by _GATED/_FILTERED/_FAILED
+        area_stats = defaultdict(lambda: [0, 0, 0])
+
+        for message in spam:
+            area_stats[message.get('area', 'NETMAIL')][_FILTERED] += 1
+
+        for message in to_hold:
+            area = message.get('area', 'NETMAIL')
+            # Hold the original FidoNet message for review
+            hold_id = self.hold_module.hold_message(message, area, direction="nntp")
+            if hold_id:
+                self.logger.info("FidoNet message held for review: %s", hold_id)
+            # Count as filtered since it's not being posted immediately
+            area_stats[area][_FILTERED] += 1
+
+        # Convert for NNTP as one batch; posting happens in _post_packet_messages
+        gate_areas = [message.get('area', 'NETMAIL') for message in to_gate]
+        gate_configs = [areas.get(area, {'newsgroup': area.lower()}) for area in gate_areas]
+        pending = list(zip(gate_areas, gate_configs, self.convert_fido_to_nntp_batch(to_gate, gate_configs)))
+
+        # Log areafix messages if any
+        if areafix_messages:
+            self.logger.info(f"Areafix: {len(areafix_messages)} processed")
+
+        return area_stats, pending
+
+    def _post_packet_messages(self, area_stats: Dict[str, List[int]],
+                              pending: List[Tuple[str, Dict[str, Any], Dict[str, Any]]],
+                              newsgroups_posted: set) -> None:
+        """Post one packet's converted messages over a single connection and log its summary"""
+        results = self.nntp.post_messages([nntp_message for _, _, nntp_message in pending])
+        for (area, area_config, _), success in zip(pending, results):
+            if success:
+                area_stats[area][_GATED] += 1
+                # Track the newsgroup for newsrc update
+                newsgroup = area_config.get('newsgroup')
+                if newsgroup:
+                    newsgroups_posted.add(newsgroup)
+            else:
+                area_stats[area][_FAILED] += 1
+
+        # Log summary for each area in this packet
+        if self.logger.isEnabledFor(logging.INFO):
+            for area, stats in area_stats.items():
+                self.logger.info(f"Area {area}: {stats[_GATED]} gated, {stats[_FILTERED]} filtered, {stats[_FAILED]} failed")
+
     def process_areafix_only(self) -> bool:
         """Process only areafix messages from packets (no spam filtering needed)"""
         self.logger.info("Starting areafix-only processing")
 
         try:
-            inbound_dir = self.config.get('Files', 'inbound_dir')
+            inbound_dir = self._inbound_dir
             if not os.path.exists(inbound_dir):
                 self.logger.warning(f"Inbound directory {inbound_dir} does not exist")
                 return True  # Not an error if no inbound
 
+            processed_dir = os.path.join(inbound_dir, "processed")
+            bad_dir = os.path.join(inbound_dir, "bad")
+            os.makedirs(processed_dir, exist_ok=True)
+            os.makedirs(bad_dir, exist_ok=True)
+
             packets_processed = 0
             areafix_total = 0
 
             # Process all .pkt files in inbound
-            for packet_file in Path(inbound_dir).glob("*.pkt"):
-                self.logger.info(f"Processing packet for areafix: {packet_file}")
+            with os.scandir(inbound_dir) as it:
+                packet_entries = [entry for entry in it if entry.is_file() and entry.name.endswith('.pkt')]
+
+            for entry in packet_entries:
+                self.logger.info("Processing packet for areafix: %s", entry.path)
 
                 try:
                     # Parse FidoNet packet
-                    messages = self.fidonet.parse_packet(str(packet_file))
+                    messages = self.fidonet.parse_packet(entry.path)
 
                     packet_areafix = 0
                     packet_other = 0
@@ -301,28 +598,24 @@ class Gateway:
 
                     # Log areafix messages if any
                     if packet_areafix > 0:
-                        self.logger.info(f"Areafix: {packet_areafix} processed from {packet_file.name}")
+                        self.logger.info(f"Areafix: {packet_areafix} processed from {entry.name}")
                         areafix_total += packet_areafix
 
                     # Only move packet if it contained ONLY areafix messages
                     # If it has other messages, leave it for the next import cycle
                     if packet_other == 0:
                         # Move processed packet (only areafix messages)
-                        processed_dir = Path(inbound_dir) / "processed"
-                        processed_dir.mkdir(exist_ok=True)
-                        packet_file.rename(processed_dir / packet_file.name)
+                        os.replace(entry.path, os.path.join(processed_dir, entry.name))
                         packets_processed += 1
                     else:
                         # Leave packet in inbound for next import cycle
-                        self.logger.info(f"Packet {packet_file.name} has {packet_other} non-areafix message(s), leaving in inbound")
+                        self.logger.info(f"Packet {entry.name} has {packet_other} non-areafix message(s), leaving in inbound")
                         packets_processed += 1
 
                 except Exception as e:
-                    self.logger.error(f"Error processing packet {packet_file}: {e}")
+                    self.logger.error(f"Error processing packet {entry.path}: {e}")
                     # Move to bad directory
-                    bad_dir = Path(inbound_dir) / "bad"
-                    bad_dir.mkdir(exist_ok=True)
-                    packet_file.rename(bad_dir / packet_file.name)
+                    self._move_to_bad(entry, bad_dir)
 
             self.logger.info(f"Areafix processing complete: {areafix_total} messages from {packets_processed} packets")
             return True
@@ -368,7 +661,7 @@ class Gateway:
                                 # Hold message for review
                                 hold_id = self.hold_module.hold_message(message, area_tag, direction="fidonet")
                                 if hold_id:
-                                    self.logger.info(f"Message held for review: {hold_id}")
+                                    self.logger.info("Message held for review: %s", hold_id)
                                 # Count as filtered since it's not being sent immediately
                                 area_filtered += 1
                             else:
@@ -387,9 +680,9 @@ class Gateway:
 
                     # Log summary for this area
                     if area_exported > 0 or area_filtered > 0 or area_failed > 0:
-                        self.logger.info(f"Area {area_tag}: {area_exported} exported, {area_filtered} filtered, {area_failed} failed")
+                        self.logger.info("Area %s: %d exported, %d filtered, %d failed", area_tag, area_exported, area_filtered, area_failed)
                     else:
-                        self.logger.info(f"Area {area_tag}: no new messages")
+                        self.logger.info("Area %s: no new messages", area_tag)
 
                 except Exception as e:
                     self.logger.error(f"Error processing {area_tag}: {e}")
@@ -419,12 +712,17 @@ class Gateway:
             self.logger.error(f"Error during export: {e}")
             return False
 
+        finally:
+            # One NNTP connection serves the whole run; close it once here
+            self.nntp.disconnect()
+
     def process_approved_messages(self) -> bool:
         """Process approved held messages and post them"""
         self.logger.info("Processing approved held messages")
 
         try:
-            approved_messages = self.hold_module.get_approved_messages()
+            # Only messages meant for FidoNet posting (came from NNTP)
+            approved_messages = self.hold_module.get_approved_messages(direction=('fidonet', 'fido'))
             if not approved_messages:
                 self.logger.info("No approved messages to process")
                 return True
@@ -434,44 +732,34 @@ class Gateway:
 
             for approved_record in approved_messages:
                 try:
-                    # Check message direction from the hold record
-                    direction = approved_record.get('direction', 'unknown')
-
-                    if direction in ['fidonet', 'fido']:
-                        # This message is meant for FidoNet posting (came from NNTP)
-                        # Get the original message
-                        original_message = self.hold_module.release_approved_message(approved_record['hold_id'])
-                        if not original_message:
-                            self.logger.error(f"Failed to retrieve approved message {approved_record['hold_id']}")
-                            messages_failed += 1
-                            continue
+                    # Get the original message
+                    original_message = self.hold_module.release_approved_message(approved_record['hold_id'])
+                    if not original_message:
+                        self.logger.error(f"Failed to retrieve approved message {approved_record['hold_id']}")
+                        messages_failed += 1
+                        continue
 
-                        area_tag = approved_record['area_tag']
+                    area_tag = approved_record['area_tag']
 
-                        # Get area configuration
-                        areas = self.load_areas_config()
-                        area_config = areas.get(area_tag, {})
+                    # Get area configuration
+                    area_config = self._get_areas_cached().get(area_tag, {})
 
-                        if not area_config:
-                            self.logger.error(f"No area configuration found for {area_tag}")
-                            messages_failed += 1
-                            continue
+                    if not area_config:
+                        self.logger.error(f"No area configuration found for {area_tag}")
+                        messages_failed += 1
+                        continue
 
-                        # Convert and create FidoNet message
-                        fido_message = self.convert_nntp_to_fido(original_message, area_tag, area_config)
+                    # Convert and create FidoNet message
+                    fido_message = self.convert_nntp_to_fido(original_message, area_tag, area_config)
 
-                        # Add to outbound
-                        success = self.fidonet.create_message(fido_message, area_tag)
-                        if success:
-                            messages_posted += 1
-                            self.logger.info(f"Posted approved message {approved_record['hold_id']} to {area_tag}")
-                        else:
-                            messages_failed += 1
-                            self.logger.error(f"Failed to post approved message {approved_record['hold_id']}")
+                    # Add to outbound
+                    success = self.fidonet.create_message(fido_message, area_tag)
+                    if success:
+                        messages_posted += 1
+                        self.logger.info("Posted approved message %s to %s", approved_record['hold_id'], area_tag)
                     else:
-                        # This message should be handled by the NNTP processing
-                        # (it came from FidoNet and is going to NNTP)
-                        continue
+                        messages_failed += 1
+                        self.logger.error(f"Failed to post approved message {approved_record['hold_id']}")
 
                 except Exception as e:
                     self.logger.error(f"Error processing approved message {approved_record.get('hold_id', 'unknown')}: {e}")
@@ -501,7 +789,8 @@ class Gateway:
         self.logger.info("Processing approved held messages for NNTP posting")
 
         try:
-            approved_messages = self.hold_module.get_approved_messages()
+            # Only messages meant for NNTP posting (came from FidoNet)
+            approved_messages = self.hold_module.get_approved_messages(direction='nntp')
             if not approved_messages:
                 self.logger.info("No approved messages to post to NNTP")
                 return True
@@ -513,16 +802,7 @@ class Gateway:
 
             for approved_record in approved_messages:
                 try:
-                    # Check message direction from the hold record BEFORE releasing
-                    direction = approved_record.get('direction', 'unknown')
-
-                    if direction != 'nntp':
-                        # This message should be handled by the FidoNet processing
-                        # (it came from NNTP and is going to FidoNet)
-                        # Skip it - don't release it here
-                        continue
-
-                    # Get the original message (only for NNTP-bound messages)
+                    # Get the original message
                     original_message = self.hold_module.release_approved_message(approved_record['hold_id'])
                     if not original_message:
                         self.logger.error(f"Failed to retrieve approved message {approved_record['hold_id']}")
@@ -535,8 +815,7 @@ class Gateway:
                     original_message['area'] = area_tag
 
                     # Get area configuration for conversion
-                    areas = self.load_areas_config()
-                    area_config = areas.get(area_tag, {'newsgroup': area_tag.lower()})
+                    area_config = self._get_areas_cached().get(area_tag, {'newsgroup': area_tag.lower()})
 
                     # Convert FidoNet message to NNTP format before posting
                     nntp_message = self.convert_fido_to_nntp(original_message, area_config)
@@ -547,7 +826,7 @@ class Gateway:
                         newsgroup = self.nntp.get_newsgroup_for_area(approved_record['area_tag'])
                         if newsgroup:
                             newsgroups_posted.add(newsgroup)
-                        self.logger.info(f"Posted approved message {approved_record['hold_id']} to NNTP")
+                        self.logger.info("Posted approved message %s to NNTP", approved_record['hold_id'])
                     else:
                         messages_failed += 1
                         self.logger.error(f"Failed to post approved message {approved_record['hold_id']} to NNTP")
@@ -597,21 +876,12 @@ class Gateway:
 
     def get_area_name_for_newsgroup(self, newsgroup: str) -> str:
         """Get FidoNet area name for newsgroup, checking [Arearemap] section first"""
-        # Check for explicit mapping in [Arearemap] section
-        if self.config.has_section('Arearemap'):
-            try:
-                for fido_area, mapped_newsgroup in self.config.items('Arearemap'):
-                    if mapped_newsgroup == newsgroup:
-                        return fido_area.upper()
-            except Exception as e:
-                self.logger.error(f"Error reading Arearemap section: {e}")
-
         # Default: use newsgroup name as area name
-        return newsgroup
+        return self._newsgroup_to_area.get(newsgroup, newsgroup)
 
     def load_areas_config(self) -> Dict[str, Dict[str, Any]]:
         """Load areas configuration file"""
-        areas_file = self.config.get('Files', 'areas_file')
+        areas_file = self._areas_file
         areas = {}
 
         if not os.path.exists(areas_file):
@@ -620,43 +890,29 @@ class Gateway:
 
         try:
             with open(areas_file, 'r') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-
-                    # Skip empty lines and comments
-                    if not line or line.startswith('#'):
-                        continue
-
-                    # Parse format: newsgroup_name: low-high
-                    if ':' in line:
-                        newsgroup, range_part = line.split(':', 1)
-                        newsgroup = newsgroup.strip()
-                        range_part = range_part.strip()
-
-                        # Parse range (e.g., "0-17" or "0-0")
-                        if '-' in range_part:
-                            try:
-                                low_str, high_str = range_part.split('-', 1)
-                                low_msg = int(low_str.strip())
-                                high_msg = int(high_str.strip())
-
-                                # Get proper FidoNet area name for this newsgroup
-                                area_tag = self.get_area_name_for_newsgroup(newsgroup)
-
-                                areas[area_tag] = {
-                                    'newsgroup': newsgroup,
-                                    'enabled': True,
-                                    'last_article': high_msg,
-                                    'low_message': low_msg,
-                                    'high_message': high_msg
-                                }
-
-                            except ValueError as e:
-                                self.logger.warning(f"Invalid range format on line {line_num}: {range_part}")
-                        else:
-                            self.logger.warning(f"Invalid format on line {line_num}: missing '-' in range")
-                    else:
-                        self.logger.warning(f"Invalid format on line {line_num}: missing ':'")
+                data = f.read()
+
+            # Parse format: newsgroup_name: low-high (e.g., "0-17" or "0-0")
+            matches = _AREAS_LINE_RE.findall(data)
+            for newsgroup, low_str, high_str in matches:
+                low_msg = int(low_str)
+                high_msg = int(high_str)
+
+                # Get proper FidoNet area name for this newsgroup
+                area_tag = self.get_area_name_for_newsgroup(newsgroup)
+
+                areas[area_tag] = {
+                    'newsgroup': newsgroup,
+                    'enabled': True,
+                    'last_article': high_msg,
+                    'low_message': low_msg,
+                    'high_message': high_msg
+                }
+
+            # Lines that are not blank, comments or valid entries were skipped
+            invalid_lines = len(_AREAS_DATA_LINE_RE.findall(data)) - len(matches)
+            if invalid_lines > 0:
+                self.logger.warning(f"Skipped {invalid_lines} invalid line(s) in {areas_file} (expected 'newsgroup: low-high')")
 
             self.logger.info(f"Loaded {len(areas)} areas from {areas_file}")
 
@@ -665,29 +921,63 @@ class Gateway:
 
         return areas
 
+    def _get_areas_cached(self) -> Dict[str, Dict[str, Any]]:
+        """Return areas configuration, reparsing the file only when its mtime changes
+
+        The returned dict is shared - callers that modify area settings must
+        use load_areas_config() instead.
+        """
+        areas_file = self._areas_file
+        try:
+            mtime = os.stat(areas_file).st_mtime
+        except OSError:
+            mtime = 0
+
+        if self._areas_cache is None or mtime != self._areas_cache_mtime:
+            self._areas_cache = self.load_areas_config()
+            self._areas_cache_mtime = mtime
+
+        return self._areas_cache
+
     def save_areas_config(self, areas: Dict[str, Dict[str, Any]]) -> bool:
         """Save updated areas configuration back to file"""
-        areas_file = self.config.get('Files', 'areas_file')
+        areas_file = self._areas_file
 
         try:
-            # Create backup
+            lines = [
+                "# PyGate Areas Configuration\n",
+                "# Format: newsgroup_name: low_message-high_message\n",
+                "# Example: comp.sys.amiga.demos: 0-53\n",
+                "\n",
+            ]
+            for area_tag, area_config in areas.items():
+                newsgroup = area_config.get('newsgroup', '')
+                if newsgroup:
+                    low_msg = area_config.get('low_message', 0)
+                    high_msg = area_config.get('last_article', area_config.get('high_message', 0))
+                    lines.append(f"{newsgroup}: {low_msg}-{high_msg}\n")
+
+            # Write the new file alongside, then swap it in atomically
+            tmp_file = f"{areas_file}.tmp"
+            with open(tmp_file, 'w') as f:
+                f.write(''.join(lines))
+
+            # Create backup: hard-link the old file instead of copying it
             backup_file = f"{areas_file}.bak"
             if os.path.exists(areas_file):
-                import shutil
-                shutil.copy2(areas_file, backup_file)
-
-            with open(areas_file, 'w') as f:
-                f.write("# PyGate Areas Configuration\n")
-                f.write("# Format: newsgroup_name: low_message-high_message\n")
-                f.write("# Example: comp.sys.amiga.demos: 0-53\n")
-                f.write("\n")
-
-                for area_tag, area_config in areas.items():
-                    newsgroup = area_config.get('newsgroup', '')
-                    if newsgroup:
-                        low_msg = area_config.get('low_message', 0)
-                        high_msg = area_config.get('last_article', area_config.get('high_message', 0))
-                        f.write(f"{newsgroup}: {low_msg}-{high_msg}\n")
+                if os.path.exists(backup_file):
+                    os.remove(backup_file)
+                try:
+                    os.link(areas_file, backup_file)
+                except OSError:
+                    # Filesystem without hard links
+                    shutil.copy2(areas_file, backup_file)
+
+            os.replace(tmp_file, areas_file)
+
+            # Force the next cached lookup to reread the file
+            self._areas_cache = None
+            self._areas_cache_mtime = 0
 
             self.logger.info(f"Updated newsrc configuration")
             return True
@@ -702,23 +992,7 @@ class Gateway:
             return date_value
         elif isinstance(date_value, str):
             try:
-                # Try parsing ISO format first (common in JSON)
-                if 'T' in date_value or '+' in date_value:
-                    # Handle ISO format with T or space
-                    if ' ' in date_value and 'T' not in date_value:
-                        # Convert space to T for ISO parsing
-                        date_value = date_value.replace(' ', 'T', 1)
-
-                    if date_value.endswith('+00:00'):
-                        return datetime.fromisoformat(date_value)
-                    elif 'Z' in date_value:
-                        return datetime.fromisoformat(date_value.replace('Z', '+00:00'))
-                    else:
-                        return datetime.fromisoformat(date_value)
-                else:
-                    # Try parsing other common formats
-                    from email.utils import parsedate_to_datetime
-                    return parsedate_to_datetime(date_value)
+                return _parse_date_str(date_value)
             except (ValueError, TypeError):
                 # If parsing fails, return current time
                 return datetime.now()
@@ -727,12 +1001,14 @@ class Gateway:
 
     def convert_nntp_to_fido(self, nntp_message: Dict[str, Any], area_tag: str, area_config: Dict[str, Any]) -> Dict[str, Any]:
         """Convert NNTP message to FidoNet format following FSC-0043.002"""
-        gateway_address = self.config.get('FidoNet', 'gateway_address')
-        if not gateway_address:
+        if not self._gateway_address:
             raise ValueError("gateway_address must be configured in [FidoNet] section")
+        if self._linked_seenby is None:
+            # Not configured: get_linked_address raises the usual error
+            self.get_linked_address()
 
         # Parse the date properly
-        message_date = self.parse_message_date(nntp_message.get('date', datetime.now()))
+        message_date = self.parse_message_date(nntp_message.get('date') or datetime.now())
 
         # Get subject and check if it will be truncated (71 chars max in FidoNet)
         subject = nntp_message.get('subject', '')
@@ -746,7 +1022,7 @@ class Gateway:
         if original_ftn_msgid:
             # Use original FidoNet MSGID to prevent duplicate detection failure
             fido_msgid = original_ftn_msgid
-            self.logger.debug(f"Using original X-FTN-MSGID: {fido_msgid}")
+            self.logger.debug("Using original X-FTN-MSGID: %s", fido_msgid)
         else:
             # Generate new MSGID from NNTP Message-ID
             fido_msgid = self.generate_fido_msgid(nntp_message.get('message_id', ''))
@@ -760,85 +1036,70 @@ class Gateway:
             'text': message_body,
             # Store full subject if it will be truncated (for write_message to handle)
             'full_subject': subject if len(subject) > 71 else None,
-            'origin': f"{self.config.get('FidoNet', 'origin_line')} ({gateway_address})",
+            'origin': self._origin_str,
             'msgid': fido_msgid,
             'reply': self.generate_fido_reply(nntp_message.get('references', '')),
             # FSC-0043.002 echomail trailer components
-            'tearline': self.generate_tearline(),
-            'pid': f"PyGate {self.config.get('Gateway', 'version')}",
-            'tid': self.generate_tid(),
+            'tearline': self._tearline_str,
+            'pid': self._pid_str,
+            'tid': self._tid_str,
             # Additional kludges for compatibility
-            'chrs': self.determine_best_charset(nntp_message.get('subject', '') + ' ' + nntp_message.get('body', '')),
+            'chrs': self.determine_best_charset(subject, message_body),
             'tzutc': self.generate_tzutc_offset(message_date),
             # REPLYADDR for return email address (FSC-0035.001)
             'replyaddr': nntp_message.get('from_email', ''),
             # REPLYTO for FidoNet routing (FSC-0035.001)
-            'replyto': f"{gateway_address} UUCP",
+            'replyto': self._replyto_str,
             # SEEN-BY and PATH per FTS-0004.001 EchoMail specification
             # SEEN-BY must include both source and destination to prevent message loops
-            'seen_by': [
-                self.fidonet.format_address_for_seenby(gateway_address),
-                self.fidonet.format_address_for_seenby(
-                    self.get_linked_address()
-                )
-            ],
-            'path': [self.fidonet.format_address_for_seenby(gateway_address)]
+            'seen_by': [self._gateway_seenby, self._linked_seenby],
+            'path': [self._gateway_seenby]
         }
 
         return fido_message
 
     def get_linked_address(self) -> str:
         """Get linked FidoNet address from config"""
-        linked_address = self.config.get('FidoNet', 'linked_address')
+        linked_address = self._linked_address
         if not linked_address:
             raise ValueError("linked_address must be configured in [FidoNet] section")
         return linked_address
 
     def generate_fido_msgid(self, nntp_message_id: str = '') -> str:
         """Generate FidoNet MSGID from NNTP Message-ID or create new one"""
-        import hashlib
-        import time
-        import binascii
-
         if nntp_message_id:
             # Use the original NNTP Message-ID and add CRC32
             message_id = nntp_message_id.strip('<>')
 
             # Calculate CRC32 of the message ID
-            crc32_value = binascii.crc32(message_id.encode('utf-8')) & 0xffffffff
-            crc32_hex = f"{crc32_value:08x}"
-
-            return f"<{message_id}> {crc32_hex}"
+            return f"<{message_id}> {_cached_crc32_hex(message_id)}"
         else:
             # Generate a new Message-ID in RFC format
-            import uuid
-            import socket
-
-            # Try to get a reasonable hostname
-            try:
-                hostname = socket.getfqdn()
-                # Reject localhost, hostnames without dots, and IPv6 addresses
-                # IPv6 addresses contain colons which break Message-ID parsing in NNTP
-                if hostname == 'localhost' or '.' not in hostname or ':' in hostname:
-                    hostname = self.config.get('Gateway', 'domain', 'gateway.local')
-            except:
-                hostname = self.config.get('Gateway', 'domain', 'gateway.local')
+            hostname = self._msgid_hostname
+            if hostname is None:
+                hostname = self._msgid_hostname = self._resolve_msgid_hostname()
 
-            # Generate unique message ID
-            unique_id = str(uuid.uuid4()).replace('-', '')[:16]
-            timestamp = f"{int(time.time()):08x}"
-            message_id = f"{unique_id}{timestamp}@{hostname}"
+            # Generate unique message ID: random part, hex timestamp, host
+            message_id = f"{token_hex(8)}{int(time.time()):08x}@{hostname}"
 
-            # Calculate CRC32
-            crc32_value = binascii.crc32(message_id.encode('utf-8')) & 0xffffffff
-            crc32_hex = f"{crc32_value:08x}"
+            # Calculate CRC32 (freshly generated, so not worth caching)
+            return f"<{message_id}> {_crc32_hex(message_id)}"
 
-            return f"<{message_id}> {crc32_hex}"
+    def _resolve_msgid_hostname(self) -> str:
+        """Pick the host part for generated Message-IDs (getfqdn may block on DNS)"""
+        # Try to get a reasonable hostname
+        try:
+            hostname = socket.getfqdn()
+            # Reject localhost, hostnames without dots, and IPv6 addresses
+            # IPv6 addresses contain colons which break Message-ID parsing in NNTP
+            if hostname == 'localhost' or '.' not in hostname or ':' in hostname:
+                hostname = self.config.get('Gateway', 'domain', fallback='gateway.local')
+        except Exception:
+            hostname = self.config.get('Gateway', 'domain', fallback='gateway.local')
+        return hostname
 
     def generate_fido_reply(self, references: str) -> str:
         """Generate FidoNet REPLY from NNTP References (use only immediate parent)"""
-        import binascii
-
         if not references:
             return ''
 
@@ -851,114 +1112,62 @@ class Gateway:
         parent_msgid = refs[-1].strip('<>')
 
         # Calculate CRC32 of the parent message ID
-        crc32_value = binascii.crc32(parent_msgid.encode('utf-8')) & 0xffffffff
-        crc32_hex = f"{crc32_value:08x}"
-
-        return f"<{parent_msgid}> {crc32_hex}"
+        return f"<{parent_msgid}> {_cached_crc32_hex(parent_msgid)}"
 
     def generate_tzutc_offset(self, message_date: datetime) -> str:
         """Generate TZUTC offset per FTS-4008.002 specification"""
-        from datetime import timezone
-
         # If message_date is naive (no timezone), assume it's local time
         if message_date.tzinfo is None:
-            # Get local timezone offset
-            import time
-            if time.daylight:
-                # Daylight saving time is in effect
-                offset_seconds = -time.altzone
-            else:
-                # Standard time
-                offset_seconds = -time.timezone
-        else:
-            # Message has timezone info, calculate offset from UTC
-            utc_offset = message_date.utcoffset()
-            if utc_offset is not None:
-                offset_seconds = int(utc_offset.total_seconds())
-            else:
-                offset_seconds = 0
-
-        # Convert seconds to hours and minutes
-        # Handle negative offsets properly
-        if offset_seconds < 0:
-            abs_seconds = abs(offset_seconds)
-            offset_hours = abs_seconds // 3600
-            offset_minutes = (abs_seconds % 3600) // 60
-            return f"-{offset_hours:02d}{offset_minutes:02d}"
+            return self._local_tzutc_str
+
+        # Message has timezone info, calculate offset from UTC
+        utc_offset = message_date.utcoffset()
+        if utc_offset is not None:
+            offset_seconds = int(utc_offset.total_seconds())
         else:
-            offset_hours = offset_seconds // 3600
-            offset_minutes = (offset_seconds % 3600) // 60
-            return f"{offset_hours:02d}{offset_minutes:02d}"
+            offset_seconds = 0
+
+        return _format_tzutc(offset_seconds)
 
     def generate_tearline(self) -> str:
         """Generate tear line with OS and version info"""
-        import platform
-
-        # Get PyGate version
-        version = self.config.get('Gateway', 'version')
-
-        # Get operating system
-        os_name = platform.system()
-        if os_name == 'Linux':
-            os_display = 'Linux'
-        elif os_name == 'Windows':
-            os_display = 'Windows'
-        elif os_name == 'Darwin':
-            os_display = 'macOS'
-        else:
-            os_display = os_name  # Fall back to actual system name
-
-        return f"PyGate {os_display} v{version}"
+        return f"PyGate {self._os_display} v{self._version}"
 
     def generate_tid(self) -> str:
         """Generate TID (Tosser ID) with platform identifier following FidoNet conventions"""
-        import platform
-
-        # Get PyGate version
-        version = self.config.get('Gateway', 'version')
-
-        # Get operating system - use short form for TID
-        os_name = platform.system()
-        if os_name == 'Linux':
-            os_short = 'Linux'
-        elif os_name == 'Windows':
-            os_short = 'Windows'
-        elif os_name == 'Darwin':
-            os_short = 'macOS'
-        else:
-            os_short = os_name
-
         # Format: "PyGate/Platform Version" (e.g., "PyGate/Linux 1.0")
-        return f"PyGate/{os_short} {version}"
+        return f"PyGate/{self._os_display} {self._version}"
 
     def parse_tzutc_offset(self, tzutc_str: str, message_date: datetime) -> datetime:
         """Parse TZUTC offset and apply to datetime per FTS-4008.002"""
         if not tzutc_str or len(tzutc_str) < 4:
             return message_date
 
+        # Same-region traffic: the offset is our own, already parsed at init
+        if tzutc_str == self._local_tzutc_str and message_date.tzinfo is None:
+            return message_date.replace(tzinfo=self._local_tz)
+
         try:
             # Parse TZUTC format: [-]hhmm
             # Per FTS-4008.002: robust implementations should accept and ignore optional plus
-            if tzutc_str.startswith('-'):
-                sign = -1
+            first = tzutc_str[0]
+            if first == '-' or first == '+':
+                sign = -1 if first == '-' else 1
                 offset_str = tzutc_str[1:]
-            elif tzutc_str.startswith('+'):
-                sign = 1
-                offset_str = tzutc_str[1:]  # Strip optional plus per spec
             else:
                 sign = 1
                 offset_str = tzutc_str
 
-            if len(offset_str) >= 4:
-                hours = int(offset_str[:2])
-                minutes = int(offset_str[2:4])
+            hhmm = offset_str[:4]
+            if len(hhmm) == 4 and hhmm.isdigit():
+                # One int() for all four digits, split arithmetically
+                hours, minutes = divmod(int(hhmm), 100)
 
                 # Convert to total seconds
                 total_seconds = sign * (hours * 3600 + minutes * 60)
 
-                # Create timezone object
-                from datetime import timezone, timedelta
-                tz = timezone(timedelta(seconds=total_seconds))
+                # Create timezone object (shared per offset)
+                tz = _fixed_timezone(total_seconds)
 
                 # If message_date is naive, assume it's in the TZUTC timezone
                 if message_date.tzinfo is None:
@@ -978,136 +1187,136 @@ class Gateway:
             return 'cp437'  # Default to CP437 per FTS-5003.001 recommendations
 
         # Parse CHRS: <identifier> <level> format
-        parts = chrs_str.strip().split()
+        parts = chrs_str.split(None, 1)
         if not parts:
             return 'cp437'
 
         identifier = parts[0].upper()
+        return _CHARSET_MAP.get(identifier, 'cp437')
 
-        # FTS-5003.001 Level 2 character sets (eight-bit, ASCII based)
-        charset_map = {
-            'CP437': 'cp437',      # IBM codepage 437 (DOS Latin US)
-            'CP850': 'cp850',      # IBM codepage 850 (DOS Latin 1)
-            'CP852': 'cp852',      # IBM codepage 852 (DOS Latin 2)
-            'CP866': 'cp866',      # IBM codepage 866 (Cyrillic Russian)
-            'CP848': 'cp1125',     # IBM codepage 848 (Cyrillic Ukrainian) - closest match
-            'CP1250': 'cp1250',    # Windows, Eastern Europe
-            'CP1251': 'cp1251',    # Windows, Cyrillic
-            'CP1252': 'cp1252',    # Windows, Western Europe
-            'CP10000': 'mac-roman', # Macintosh Roman character set
-            'LATIN-1': 'iso-8859-1',  # ISO 8859-1 (Western European)
-            'LATIN-2': 'iso-8859-2',  # ISO 8859-2 (Eastern European)
-            'LATIN-5': 'iso-8859-9',  # ISO 8859-9 (Turkish)
-            'LATIN-9': 'iso-8859-15', # ISO 8859-15 (Western Europe with EURO sign)
-            # Level 4
-            'UTF-8': 'utf-8',      # UTF-8 encoding for the Unicode character set
-            # Level 1 (seven-bit) - rarely used but included for completeness
-            'ASCII': 'ascii',      # ISO 646-1 (US ASCII)
-            # Obsolete identifiers that should still be handled
-            'IBMPC': 'cp437',      # IBM PC character sets - treat as CP437
-            '+7_FIDO': 'cp866',    # Synonym for CP866
-            'MAC': 'mac-roman',    # Macintosh character set
-        }
-
-        return charset_map.get(identifier, 'cp437')
+    def convert_text_encoding(self, text: Union[str, bytes], from_charset: str, to_charset: str = 'utf-8') -> str:
+        """Convert text between character encodings
 
-    def convert_text_encoding(self, text: str, from_charset: str, to_charset: str = 'utf-8') -> str:
-        """Convert text between character encodings"""
+        Bytes are decoded directly. A str is packet text as decoded by
+        FidoNetModule, which uses cp437 for every byte, so its raw bytes are
+        recovered exactly before decoding with the message's own charset.
+        """
         if not text or from_charset == to_charset:
             return text
 
+        # Every CHRS charset we map is ASCII-compatible, so pure ASCII text
+        # (most FidoNet traffic) comes out unchanged
+        if isinstance(text, str) and text.isascii():
+            return text
+
         try:
-            # If text is already UTF-8, try to decode it first
             if isinstance(text, str):
-                # Encode to bytes using source charset, then decode as UTF-8
                 if from_charset == 'utf-8':
                     return text
-                # For conversion from other charsets, we need to assume text is in that charset
-                # This is a limitation - in practice, text encoding detection would be better
-                encoded_bytes = text.encode('latin1')  # Preserve byte values
-                decoded_text = encoded_bytes.decode(from_charset, errors='replace')
-                if to_charset == 'utf-8':
-                    return decoded_text
+                if from_charset == _PACKET_TEXT_CODEC:
+                    # Already decoded with the right charset by the packet reader
+                    decoded_text = text
                 else:
-                    return decoded_text.encode(to_charset, errors='replace').decode(to_charset)
+                    decoded_text = text.encode(_PACKET_TEXT_CODEC).decode(from_charset, errors='replace')
             else:
                 # Text is bytes
                 decoded_text = text.decode(from_charset, errors='replace')
-                if to_charset == 'utf-8':
-                    return decoded_text
-                else:
-                    return decoded_text.encode(to_charset, errors='replace').decode(to_charset)
+
+            if to_charset == 'utf-8':
+                return decoded_text
+            else:
+                return decoded_text.encode(to_charset, errors='replace').decode(to_charset)
         except (UnicodeDecodeError, UnicodeEncodeError, LookupError):
             # If conversion fails, return original text
             return text if isinstance(text, str) else text.decode('utf-8', errors='replace')
 
-    def determine_best_charset(self, text: str) -> str:
-        """Determine best FTS-5003.001 charset for text content"""
-        if not text:
-            return 'ASCII 1'
+    def determine_best_charset(self, *texts: str) -> str:
+        """Determine best FTS-5003.001 charset for text content
 
-        # Check if pure ASCII
-        try:
-            text.encode('ascii')
+        Several texts (e.g. subject and body) can be passed; they are checked
+        together without being concatenated into a single copy.
+        """
+        # Check if pure ASCII (also covers no/empty texts)
+        if all(text.isascii() for text in texts):
             return 'ASCII 1'  # Level 1 pure ASCII
-        except UnicodeEncodeError:
-            pass
+
+        # Distinct characters, so each table check below is one subset test
+        chars = set().union(*texts)
 
         # Check if CP437 (common DOS charset) can represent the text
-        try:
-            text.encode('cp437')
+        if chars <= _CP437_CHARS:
             return 'CP437 2'  # Level 2 CP437
-        except UnicodeEncodeError:
-            pass
 
         # Check if CP1252 (Windows Western) can represent the text
-        try:
-            text.encode('cp1252')
+        if chars <= _CP1252_CHARS:
             return 'CP1252 2'  # Level 2 Windows Western
-        except UnicodeEncodeError:
-            pass
 
         # Fall back to UTF-8 for international content
         return 'UTF-8 4'  # Level 4 UTF-8
 
     def convert_fido_to_nntp(self, fido_message: Dict[str, Any], area_config: Dict[str, Any]) -> Dict[str, Any]:
         """Convert FidoNet message to NNTP format"""
-        # Get original datetime and apply TZUTC if present
-        original_date = fido_message.get('datetime', datetime.now())
+        return self.convert_fido_to_nntp_batch([fido_message], [area_config])[0]
 
-        # If datetime is a string (from JSON), parse it to datetime object
-        if isinstance(original_date, str):
-            original_date = datetime.fromisoformat(original_date)
+    def convert_fido_to_nntp_batch(self, fido_messages: List[Dict[str, Any]],
+                                   area_configs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert a batch of FidoNet messages (e.g. one packet) to NNTP format
 
-        tzutc_str = fido_message.get('tzutc', '')
-
-        # Apply TZUTC timezone information per FTS-4008.002
-        message_date = self.parse_tzutc_offset(tzutc_str, original_date) if tzutc_str else original_date
-
-        # Handle character set conversion per FTS-5003.001
-        chrs_str = fido_message.get('chrs', '')
-        source_encoding = self.get_charset_encoding(chrs_str)
-
-        # Convert text content to UTF-8 for NNTP
-        from_name = self.convert_text_encoding(fido_message.get('from_name', 'Unknown'), source_encoding, 'utf-8')
-        subject = self.convert_text_encoding(fido_message.get('subject', ''), source_encoding, 'utf-8')
-        body = self.convert_text_encoding(fido_message.get('text', ''), source_encoding, 'utf-8')
-
-        nntp_message = {
-            'newsgroup': area_config.get('newsgroup', ''),
-            'from_name': from_name,
-            'subject': subject,
-            'datetime': message_date,  # build_nntp_article expects 'datetime'
-            'text': body,              # build_nntp_article expects 'text'
-            'msgid': fido_message.get('msgid', ''),  # build_nntp_article expects 'msgid'
-            'reply': fido_message.get('reply', ''),  # build_nntp_article expects 'reply'
-            'organization': self.config.get('FidoNet', 'origin_line'),
-            'chrs': chrs_str,          # build_nntp_article expects 'chrs' for charset
-            'area': fido_message.get('area', ''),  # Include FidoNet area for mapping
-            'origin': fido_message.get('origin', '')  # Include origin line
-        }
-
-        return nntp_message
+        area_configs runs parallel to fido_messages. Lookups that only depend on
+        values shared across the batch, such as the CHRS kludge, are done once.
+        """
+        parse_tzutc_offset = self.parse_tzutc_offset
+        convert_text_encoding = self.convert_text_encoding
+        organization = self._origin_line
+        # CHRS kludge -> Python codec, resolved once per distinct value
+        encodings = {}
+
+        nntp_messages = []
+        for fido_message, area_config in zip(fido_messages, area_configs):
+            # Get original datetime and apply TZUTC if present
+            original_date = fido_message.get('datetime') or datetime.now()
+
+            # If datetime is a string (from JSON), parse it to datetime object
+            if isinstance(original_date, str):
+                original_date = datetime.fromisoformat(original_date)
+
+            tzutc_str = fido_message.get('tzutc', '')
+
+            # Apply TZUTC timezone information per FTS-4008.002
+            message_date = parse_tzutc_offset(tzutc_str, original_date) if tzutc_str else original_date
+
+            # Handle character set conversion per FTS-5003.001
+            chrs_str = fido_message.get('chrs', '')
+            source_encoding = encodings.get(chrs_str)
+            if source_encoding is None:
+                source_encoding = encodings[chrs_str] = self.get_charset_encoding(chrs_str)
+
+            from_name = fido_message.get('from_name', 'Unknown')
+            subject = fido_message.get('subject', '')
+            body = fido_message.get('text', '')
+
+            # Convert text content to UTF-8 for NNTP (not needed when the packet
+            # reader's decode already gave the right text)
+            if source_encoding not in _PASSTHROUGH_ENCODINGS:
+                from_name = convert_text_encoding(from_name, source_encoding, 'utf-8')
+                subject = convert_text_encoding(subject, source_encoding, 'utf-8')
+                body = convert_text_encoding(body, source_encoding, 'utf-8')
+
+            nntp_messages.append({
+                'newsgroup': area_config.get('newsgroup', ''),
+                'from_name': from_name,
+                'subject': subject,
+                'datetime': message_date,  # build_nntp_article expects 'datetime'
+                'text': body,              # build_nntp_article expects 'text'
+                'msgid': fido_message.get('msgid', ''),  # build_nntp_article expects 'msgid'
+                'reply': fido_message.get('reply', ''),  # build_nntp_article expects 'reply'
+                'organization': organization,
+                'chrs': chrs_str,          # build_nntp_article expects 'chrs' for charset
+                'area': fido_message.get('area', ''),  # Include FidoNet area for mapping
+                'origin': fido_message.get('origin', '')  # Include origin line
+            })
+
+        return nntp_messages
 
     def pack_messages(self) -> bool:
         """Pack outbound messages into packets"""
@@ -1131,18 +1340,19 @@ class Gateway:
 
         # Clean up old processed packets
         try:
-            inbound_dir = Path(self.config.get('Files', 'inbound_dir'))
-            processed_dir = inbound_dir / "processed"
+            processed_dir = os.path.join(self._inbound_dir, "processed")
 
-            if processed_dir.exists():
+            if os.path.isdir(processed_dir):
                 # Remove packets older than 30 days
-                import time
-                current_time = time.time()
+                cutoff = time.time() - (30 * 24 * 3600)
 
-                for packet_file in processed_dir.glob("*.pkt"):
-                    if current_time - packet_file.stat().st_mtime > (30 * 24 * 3600):
-                        packet_file.unlink()
-                        self.logger.info(f"Removed old packet: {packet_file}")
+                with os.scandir(processed_dir) as it:
+                    for entry in it:
+                        if not entry.name.endswith('.pkt') or not entry.is_file():
+                            continue
+                        if entry.stat().st_mtime < cutoff:
+                            os.unlink(entry.path)
+                            self.logger.info(f"Removed old packet: {entry.path}")
 
         except Exception as e:
             self.logger.error(f"Error during maintenance: {e}")
@@ -5,13 +5,83 @@ Handles holding and reviewing usenet messages from arearemap groups
 """
 
 import os
+import copy
 import json
+import time
 import uuid
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, Union
 from datetime import datetime
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# [Arearemap] keys that are settings rather than area mappings
+_AREAREMAP_SETTINGS = frozenset(('hold', 'notify_sysop'))
+
+# Body of the netmail sent to the sysop when messages are held
+_NOTIFICATION_TEMPLATE = """PyGate Message Hold Notification
+
+You have {pending_count} message(s) held for review in {area_text}.
+
+These messages require manual approval before being gated between
+NNTP and FidoNet.
+
+To review and approve/reject these messages, use the PyGate admin
+panel or command line tools.
+
+This notification was automatically generated by PyGate.
+
+---
+PyGate FTN-NNTP Gateway
+{gateway_address}"""
+
+
+def _read_record(path) -> Any:
+    """Read and parse a JSON file, using orjson when available
+
+    Hold records are small, so the file is read with one read() sized from
+    fstat() instead of through a buffered file object.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        data = os.read(fd, os.fstat(fd).st_size)
+    finally:
+        os.close(fd)
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _hold_file_names(dir_path) -> set:
+    """Names of the hold files in a status directory"""
+    return {name for name in os.listdir(dir_path) if name.endswith('.json')}
+
+
+def _write_record(path, record: Any):
+    """Serialize a record to compact UTF-8 JSON and write it atomically
+
+    The bytes go to a temporary file with a plain os.write and are then
+    renamed over path, so readers never see a partially written record.
+    """
+    if orjson is not None:
+        data = orjson.dumps(record, default=str, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        data = json.dumps(record, separators=(',', ':'), ensure_ascii=False, default=str).encode('utf-8')
+    tmp_path = f"{path}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
+
 
 class MessageHoldModule:
     """Module for holding and reviewing messages from arearemap groups"""
@@ -31,39 +101,96 @@ class MessageHoldModule:
         # File to track notification state (prevent duplicate notifications)
         self.notification_file = self.hold_dir / 'notifications.json'
 
+        # Parsed hold records per subdirectory, keyed by file name and
+        # tagged with the directory mtime they were read at
+        self._record_cache: Dict[str, Tuple[int, Dict[str, Dict[str, Any]]]] = {}
+
+        # Hold settings, read once since should_hold_message runs for every
+        # gated message. Arearemap keys other than its own settings (and any
+        # inherited [DEFAULT] keys) are area tags.
+        self._hold_enabled = self.config.getboolean('Arearemap', 'Hold', fallback=False)
+        self._hold_areas = frozenset()
+        if self.config.has_section('Arearemap'):
+            try:
+                skip = _AREAREMAP_SETTINGS.union(self.config.defaults())
+                self._hold_areas = frozenset(area_name.upper() for area_name in self.config.options('Arearemap')
+                                             if area_name not in skip)
+            except Exception as e:
+                self.logger.error(f"Error reading arearemap areas: {e}")
+
+        # Sysop notification settings; the time of the last notification is
+        # remembered once known so holds don't re-read notifications.json
+        self._notify_sysop = self.config.getboolean('Arearemap', 'notify_sysop', fallback=False)
+        self._last_notification: Optional[datetime] = None
+        self._sysop_name = self.config.get('Gateway', 'sysop', fallback='Sysop')
+        self._gateway_address = self.config.get('FidoNet', 'gateway_address', fallback=None)
+        self._linked_address = self.config.get('FidoNet', 'linked_address', fallback=None)
+
+    def _load_records(self, status: str) -> Dict[str, Dict[str, Any]]:
+        """Return the parsed hold records in a status subdirectory
+
+        Hold files are written once and then moved, so when the directory
+        mtime and file names are unchanged the cached records are returned
+        as-is; otherwise only files not seen before are read. Records are
+        ordered newest first by held_at.
+        """
+        dir_path = self.hold_dir / status
+        mtime = os.stat(dir_path).st_mtime_ns
+        cached = self._record_cache.get(status)
+        # On filesystems with coarse timestamps a file created in the same
+        # tick as the last scan leaves the mtime unchanged, so check names too
+        if cached and cached[0] == mtime and cached[1].keys() == _hold_file_names(dir_path):
+            return cached[1]
+
+        previous = cached[1] if cached else {}
+        records = {}
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.json') or not entry.is_file():
+                    continue
+                hold_record = previous.get(entry.name)
+                if hold_record is None:
+                    try:
+                        hold_record = _read_record(entry.path)
+                    except Exception as e:
+                        self.logger.error(f"Error reading hold file {entry.path}: {e}")
+                        continue
+                records[entry.name] = hold_record
+
+        # Newest first, so listings are already in display order
+        records = dict(sorted(records.items(), key=lambda item: item[1].get('held_at', ''), reverse=True))
+        self._record_cache[status] = (mtime, records)
+        return records
+
+    def _get_record(self, status: str, hold_file: Path) -> Dict[str, Any]:
+        """Return a deep copy of a hold record, reusing the cached parse if any
+
+        A hold file is not modified until it is moved out of its directory,
+        so a cached record for a file that still exists is current even if
+        the directory has changed since; bulk approve/reject after a listing
+        then needs no re-read. The copy is deep because callers modify the
+        nested full_message before posting it.
+        """
+        cached = self._record_cache.get(status)
+        hold_record = cached[1].get(hold_file.name) if cached else None
+        if hold_record is None:
+            return _read_record(hold_file)
+        return copy.deepcopy(hold_record)
+
     def should_hold_message(self, message: Dict[str, Any], area_tag: str) -> bool:
         """Check if message should be held for review"""
-        # Check if holding is enabled globally
-        if not self.config.getboolean('Arearemap', 'Hold', fallback=False):
-            return False
-
-        # Check if this area is in the arearemap section
-        if not self.config.has_section('Arearemap'):
+        # Holding must be enabled and the area mapped in arearemap
+        if not self._hold_enabled or area_tag.upper() not in self._hold_areas:
             return False
 
-        # Check if area_tag is mapped in arearemap
-        try:
-            arearemap_areas = dict(self.config.items('Arearemap'))
-            # Remove the 'hold' setting from the check
-            arearemap_areas.pop('hold', None)
-
-            # Check if this area tag exists in arearemap
-            area_tag_upper = area_tag.upper()
-            for area_name in arearemap_areas.keys():
-                if area_name.upper() == area_tag_upper:
-                    self.logger.info(f"Message in arearemap area '{area_tag}' will be held for review")
-                    return True
-
-        except Exception as e:
-            self.logger.error(f"Error checking arearemap areas: {e}")
-
-        return False
+        self.logger.info(f"Message in arearemap area '{area_tag}' will be held for review")
+        return True
 
     def hold_message(self, message: Dict[str, Any], area_tag: str, direction: str = "auto") -> str:
         """Hold a message for review, returns hold ID"""
         try:
             # Generate unique hold ID
-            hold_id = str(uuid.uuid4())
+            hold_id = uuid.uuid4().hex
 
             # Determine message direction if not specified
             if direction == "auto":
@@ -75,18 +202,26 @@ class MessageHoldModule:
             # Get message body from different possible fields
             body = message.get('body', '') or message.get('text', '')
 
-            # Create hold record
+            now = datetime.now()
+            date = message.get('date')
+            if date is None:
+                date = now
+            date_str = date.isoformat() if hasattr(date, 'isoformat') else str(date)
+
+            # Create hold record. The full message is kept in the same file:
+            # one *.json per held message is what bin/gate.py counts and what
+            # the admin panel lists, body view included.
             hold_record = {
                 'hold_id': hold_id,
                 'area_tag': area_tag,
                 'newsgroup': message.get('newsgroup', ''),
                 'from_name': message.get('from_name', 'Unknown'),
                 'subject': message.get('subject', ''),
-                'date': message.get('date', datetime.now()).isoformat() if hasattr(message.get('date', datetime.now()), 'isoformat') else str(message.get('date', datetime.now())),
+                'date': date_str,
                 'message_id': message.get('message_id', ''),
                 'body_preview': body[:200] + ('...' if len(body) > 200 else ''),
                 'full_message': message,
-                'held_at': datetime.now().isoformat(),
+                'held_at': now.isoformat(),
                 'status': 'pending',
                 'reviewed_by': None,
                 'reviewed_at': None,
@@ -97,8 +232,7 @@ class MessageHoldModule:
 
             # Save to pending directory
             hold_file = self.hold_dir / 'pending' / f"{hold_id}.json"
-            with open(hold_file, 'w', encoding='utf-8') as f:
-                json.dump(hold_record, f, indent=2, ensure_ascii=False, default=str)
+            _write_record(hold_file, hold_record)
 
             self.logger.info(f"Message held for review: (Area: {area_tag}, Subject: {message.get('subject', 'No subject')})")
 
@@ -114,19 +248,10 @@ class MessageHoldModule:
     def get_pending_messages(self) -> List[Dict[str, Any]]:
         """Get list of pending messages for review"""
         pending_messages = []
-        pending_dir = self.hold_dir / 'pending'
 
         try:
-            for hold_file in pending_dir.glob('*.json'):
-                try:
-                    with open(hold_file, 'r', encoding='utf-8') as f:
-                        hold_record = json.load(f)
-                        pending_messages.append(hold_record)
-                except Exception as e:
-                    self.logger.error(f"Error reading hold file {hold_file}: {e}")
-
-            # Sort by held_at date (newest first)
-            pending_messages.sort(key=lambda x: x.get('held_at', ''), reverse=True)
+            # Records come back sorted by held_at date (newest first)
+            pending_messages = [copy.deepcopy(hold_record) for hold_record in self._load_records('pending').values()]
 
         except Exception as e:
             self.logger.error(f"Error getting pending messages: {e}")
@@ -136,10 +261,11 @@ class MessageHoldModule:
     def get_message_details(self, hold_id: str) -> Optional[Dict[str, Any]]:
         """Get full details of a held message"""
         try:
-            hold_file = self.hold_dir / 'pending' / f"{hold_id}.json"
-            if hold_file.exists():
-                with open(hold_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            # Served from the pending record cache, which is dropped as soon
+            # as the pending directory changes (e.g. on approve or reject)
+            hold_record = self._load_records('pending').get(f"{hold_id}.json")
+            if hold_record is not None:
+                return copy.deepcopy(hold_record)
         except Exception as e:
             self.logger.error(f"Error getting message details for {hold_id}: {e}")
         return None
@@ -153,8 +279,7 @@ class MessageHoldModule:
                 self.logger.error(f"Hold file not found: {hold_id}")
                 return False
 
-            with open(hold_file, 'r', encoding='utf-8') as f:
-                hold_record = json.load(f)
+            hold_record = self._get_record('pending', hold_file)
 
             # Update status
             hold_record['status'] = 'approved'
@@ -162,13 +287,9 @@ class MessageHoldModule:
             hold_record['reviewed_at'] = datetime.now().isoformat()
             hold_record['action'] = 'approve'
 
-            # Move to approved directory
-            approved_file = self.hold_dir / 'approved' / f"{hold_id}.json"
-            with open(approved_file, 'w', encoding='utf-8') as f:
-                json.dump(hold_record, f, indent=2, ensure_ascii=False, default=str)
-
-            # Remove from pending
-            hold_file.unlink()
+            # Rewrite in place, then move to approved directory in one rename
+            _write_record(hold_file, hold_record)
+            os.replace(hold_file, self.hold_dir / 'approved' / f"{hold_id}.json")
 
             self.logger.info(f"Message {hold_id} approved")
             return True
@@ -186,8 +307,7 @@ class MessageHoldModule:
                 self.logger.error(f"Hold file not found: {hold_id}")
                 return False
 
-            with open(hold_file, 'r', encoding='utf-8') as f:
-                hold_record = json.load(f)
+            hold_record = self._get_record('pending', hold_file)
 
             # Update status
             hold_record['status'] = 'rejected'
@@ -196,13 +316,9 @@ class MessageHoldModule:
             hold_record['action'] = 'reject'
             hold_record['notes'] = reason
 
-            # Move to rejected directory
-            rejected_file = self.hold_dir / 'rejected' / f"{hold_id}.json"
-            with open(rejected_file, 'w', encoding='utf-8') as f:
-                json.dump(hold_record, f, indent=2, ensure_ascii=False, default=str)
-
-            # Remove from pending
-            hold_file.unlink()
+            # Rewrite in place, then move to rejected directory in one rename
+            _write_record(hold_file, hold_record)
+            os.replace(hold_file, self.hold_dir / 'rejected' / f"{hold_id}.json")
 
             self.logger.info(f"Message {hold_id} rejected: {reason}")
             return True
@@ -211,19 +327,20 @@ class MessageHoldModule:
             self.logger.error(f"Error rejecting message {hold_id}: {e}")
             return False
 
-    def get_approved_messages(self) -> List[Dict[str, Any]]:
-        """Get list of approved messages ready for posting"""
+    def get_approved_messages(self, direction: Optional[Union[str, Tuple[str, ...]]] = None) -> List[Dict[str, Any]]:
+        """Get list of approved messages ready for posting
+
+        If direction is given (a direction name or a tuple of them), only
+        records held for that direction are returned.
+        """
         approved_messages = []
-        approved_dir = self.hold_dir / 'approved'
+        if isinstance(direction, str):
+            direction = (direction,)
 
         try:
-            for hold_file in approved_dir.glob('*.json'):
-                try:
-                    with open(hold_file, 'r', encoding='utf-8') as f:
-                        hold_record = json.load(f)
-                        approved_messages.append(hold_record)
-                except Exception as e:
-                    self.logger.error(f"Error reading approved file {hold_file}: {e}")
+            for hold_record in self._load_records('approved').values():
+                if direction is None or hold_record.get('direction', 'unknown') in direction:
+                    approved_messages.append(copy.deepcopy(hold_record))
 
         except Exception as e:
             self.logger.error(f"Error getting approved messages: {e}")
@@ -238,26 +355,28 @@ class MessageHoldModule:
                 self.logger.error(f"Approved file not found: {hold_id}")
                 return None
 
-            with open(approved_file, 'r', encoding='utf-8') as f:
-                hold_record = json.load(f)
+            hold_record = self._get_record('approved', approved_file)
 
             # Get the original message
             original_message = hold_record.get('full_message', {})
 
-            # Copy to backup directory before removing
+            # Move to backup directory (message will be posted)
             backup_file = self.hold_dir / 'backup' / f"{hold_id}.json"
             try:
-                # Add timestamp for when it was released
-                hold_record['released_at'] = datetime.now().isoformat()
-                with open(backup_file, 'w', encoding='utf-8') as f:
-                    json.dump(hold_record, f, indent=2, ensure_ascii=False, default=str)
+                # The record is moved unchanged; its mtime is the release time
+                os.utime(approved_file)
+                os.replace(approved_file, backup_file)
                 self.logger.info(f"Backed up approved message {hold_id} to backup directory")
             except Exception as backup_error:
                 self.logger.error(f"Error backing up approved message {hold_id}: {backup_error}")
                 # Continue even if backup fails - we don't want to block message posting
-
-            # Remove the approved file (message will be posted)
-            approved_file.unlink()
+                try:
+                    approved_file.unlink()
+                except Exception as unlink_error:
+                    # Still approved on disk, so posting now would post it
+                    # again next run; leave it for the next run instead
+                    self.logger.error(f"Error removing approved message {hold_id}: {unlink_error}")
+                    return None
 
             self.logger.info(f"Released approved message {hold_id} for posting")
             return original_message
@@ -269,27 +388,26 @@ class MessageHoldModule:
     def cleanup_old_records(self, days_to_keep: int = 30):
         """Clean up old approved and rejected records"""
         try:
-            from datetime import timedelta
-            cutoff_date = datetime.now() - timedelta(days=days_to_keep)
-            cutoff_str = cutoff_date.isoformat()
+            # Records are rewritten when reviewed, so the file mtime is the
+            # review time and no record needs to be parsed
+            cutoff_ts = time.time() - days_to_keep * 86400
 
             for directory in ['approved', 'rejected']:
                 dir_path = self.hold_dir / directory
                 if not dir_path.exists():
                     continue
 
-                for hold_file in dir_path.glob('*.json'):
-                    try:
-                        with open(hold_file, 'r', encoding='utf-8') as f:
-                            hold_record = json.load(f)
+                with os.scandir(dir_path) as entries:
+                    hold_files = [entry for entry in entries if entry.name.endswith('.json')]
 
-                        reviewed_at = hold_record.get('reviewed_at', '')
-                        if reviewed_at and reviewed_at < cutoff_str:
-                            hold_file.unlink()
-                            self.logger.info(f"Cleaned up old {directory} record: {hold_file.name}")
+                for entry in hold_files:
+                    try:
+                        if entry.stat().st_mtime < cutoff_ts:
+                            os.unlink(entry.path)
+                            self.logger.info(f"Cleaned up old {directory} record: {entry.name}")
 
                     except Exception as e:
-                        self.logger.error(f"Error cleaning up {hold_file}: {e}")
+                        self.logger.error(f"Error cleaning up {entry.path}: {e}")
 
         except Exception as e:
             self.logger.error(f"Error during cleanup: {e}")
@@ -305,8 +423,10 @@ class MessageHoldModule:
         try:
             for status in stats.keys():
                 dir_path = self.hold_dir / status
-                if dir_path.exists():
-                    stats[status] = len(list(dir_path.glob('*.json')))
+                try:
+                    stats[status] = len(_hold_file_names(dir_path))
+                except FileNotFoundError:
+                    continue
 
         except Exception as e:
             self.logger.error(f"Error getting hold statistics: {e}")
@@ -317,8 +437,7 @@ class MessageHoldModule:
         """Load notification state to prevent duplicate notifications"""
         try:
             if self.notification_file.exists():
-                with open(self.notification_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                return _read_record(self.notification_file)
         except Exception as e:
             self.logger.error(f"Error loading notification state: {e}")
 
@@ -327,15 +446,21 @@ class MessageHoldModule:
     def save_notification_state(self, state: Dict[str, Any]):
         """Save notification state"""
         try:
-            with open(self.notification_file, 'w', encoding='utf-8') as f:
-                json.dump(state, f, indent=2, default=str)
+            _write_record(self.notification_file, state)
         except Exception as e:
             self.logger.error(f"Error saving notification state: {e}")
 
     def should_send_notification(self, area_tag: str) -> bool:
         """Check if we should send a notification for this area"""
         # Check if notifications are enabled
-        if not self.config.getboolean('Arearemap', 'notify_sysop', fallback=False):
+        if not self._notify_sysop:
+            return False
+
+        # The last notification time only moves forward, so a remembered
+        # time inside the last hour is enough to say no without touching
+        # the state file; otherwise re-check it for a newer notification
+        # sent by another process
+        if self._last_notification and (datetime.now() - self._last_notification).total_seconds() < 3600:
             return False
 
         state = self.load_notification_state()
@@ -346,6 +471,7 @@ class MessageHoldModule:
             try:
                 last_time = datetime.fromisoformat(last_notification)
                 current_time = datetime.now()
+                self._last_notification = last_time
 
                 # Don't send another notification if one was sent in the last hour
                 if (current_time - last_time).total_seconds() < 3600:
@@ -357,16 +483,15 @@ class MessageHoldModule:
 
     def generate_netmail_notification(self, areas_with_held_messages: List[str]) -> Dict[str, Any]:
         """Generate a netmail notification for held messages"""
-        sysop_name = self.config.get('Gateway', 'sysop', fallback='Sysop')
-        gateway_address = self.config.get('FidoNet', 'gateway_address')
-        linked_address = self.config.get('FidoNet', 'linked_address')
+        gateway_address = self._gateway_address
+        linked_address = self._linked_address
 
         if not gateway_address or not linked_address:
             self.logger.error("Cannot send notification: gateway_address or linked_address not configured")
             return None
 
         # Count total pending messages
-        pending_count = len(list((self.hold_dir / 'pending').glob('*.json')))
+        pending_count = len(self._load_records('pending'))
 
         # Create message body
         if len(areas_with_held_messages) == 1:
@@ -375,28 +500,15 @@ class MessageHoldModule:
             area_list = ", ".join(areas_with_held_messages[:-1])
             area_text = f"areas {area_list} and {areas_with_held_messages[-1]}"
 
-        body = f"""PyGate Message Hold Notification
-
-You have {pending_count} message(s) held for review in {area_text}.
-
-These messages require manual approval before being gated between
-NNTP and FidoNet.
-
-To review and approve/reject these messages, use the PyGate admin
-panel or command line tools.
-
-This notification was automatically generated by PyGate.
-
----
-PyGate FTN-NNTP Gateway
-{gateway_address}"""
+        body = _NOTIFICATION_TEMPLATE.format(pending_count=pending_count, area_text=area_text,
+                                             gateway_address=gateway_address)
 
         # Create netmail message structure
         netmail = {
             'area': 'NETMAIL',
             'from_name': 'PyGate',
             'from_address': gateway_address,
-            'to_name': sysop_name,
+            'to_name': self._sysop_name,
             'to_address': linked_address,
             'subject': f'PyGate: Messages held for review ({len(areas_with_held_messages)} areas)',
             'datetime': datetime.now(),
@@ -412,9 +524,10 @@ PyGate FTN-NNTP Gateway
         if not self.should_send_notification(area_tag):
             return
 
-        # Get all pending messages and their areas
-        pending_messages = self.get_pending_messages()
-        areas_with_messages = list(set(msg.get('area_tag', 'UNKNOWN') for msg in pending_messages))
+        # Areas of all pending messages, straight from the record cache
+        # (no copy or sort needed); only newly held files are parsed
+        pending_records = self._load_records('pending').values()
+        areas_with_messages = list({record.get('area_tag', 'UNKNOWN') for record in pending_records})
 
         if not areas_with_messages:
             return
@@ -435,8 +548,9 @@ PyGate FTN-NNTP Gateway
 
             if success:
                 # Update notification state
+                self._last_notification = datetime.now()
                 state = self.load_notification_state()
-                state["last_notification"] = datetime.now().isoformat()
+                state["last_notification"] = self._last_notification.isoformat()
                 state["notified_areas"] = areas_with_messages
                 self.save_notification_state(state)
 
@@ -10,8 +10,58 @@ import socket
 import ssl
 import re
 import email
-from typing import Optional, Tuple, List, Dict, Any
+from typing import Optional, Tuple, List, Dict, Any, Iterable, Iterator
 from dataclasses import dataclass
+from functools import lru_cache
+
+
+# Size of the scratch buffer each recv_into() call fills
+_RECV_SIZE = 65536
+
+# TCP keepalive timing (seconds idle, seconds between probes, probe count),
+# applied where the platform exposes the per-socket options
+_KEEPALIVE_OPTIONS = (
+    ('TCP_KEEPIDLE', 60),
+    ('TCP_KEEPINTVL', 10),
+    ('TCP_KEEPCNT', 3),
+)
+
+
+# TLS sessions from earlier connections made with the shared default
+# context, keyed by (host, port), so reconnects can resume them
+_ssl_sessions: Dict[Tuple[str, int], ssl.SSLSession] = {}
+
+
+@lru_cache(maxsize=None)
+def _default_ssl_context() -> ssl.SSLContext:
+    """Shared default SSL context; loading the CA bundle is not cheap"""
+    return ssl.create_default_context()
+
+
+# Overview line: article_num <tab> subject <tab> from <tab> date <tab>
+# message-id <tab> references <tab> bytes <tab> lines [<tab> extra fields]
+_OVER_RE = re.compile(rb' *(\d+) *\t([^\t]*)\t([^\t]*)\t([^\t]*)\t([^\t]*)\t([^\t]*)\t([^\t]*)\t([^\t]*)')
+
+
+def _overview_entry(match: re.Match) -> Tuple:
+    """Build an overview tuple from an _OVER_RE match, decoding only text fields"""
+    number, subject, from_, date, message_id, references, size, lines = match.groups()
+    return (
+        int(number),
+        subject.decode('utf-8', errors='replace'),
+        from_.decode('utf-8', errors='replace'),
+        date.decode('utf-8', errors='replace'),
+        message_id.decode('utf-8', errors='replace'),
+        references.decode('utf-8', errors='replace'),
+        int(size) if size.isdigit() else 0,
+        int(lines) if lines.isdigit() else 0,
+    )
+
+
+def _parse_overview(lines: List[bytes]) -> List[Tuple]:
+    """Parse OVER/XOVER response lines, skipping malformed ones"""
+    matches = map(_OVER_RE.match, lines)
+    return [_overview_entry(match) for match in matches if match]
 
 
 @dataclass
@@ -20,6 +70,26 @@ class NNTPResponse:
     code: int
     message: str
     lines: List[bytes] = None
+    # First digit of the code (2 = success, 4 = temporary, 5 = permanent...)
+    category: int = None
+
+    def __post_init__(self):
+        if self.category is None:
+            self.category = self.code // 100
+
+
+@dataclass
+class ArticleInfo:
+    """Article returned by ARTICLE, in the nntplib ArticleInfo shape"""
+    __slots__ = ('lines',)
+    lines: List[bytes]
+
+
+@dataclass
+class HeaderInfo:
+    """Headers returned by HEAD, in the nntplib ArticleInfo shape"""
+    __slots__ = ('lines',)
+    lines: List[bytes]
 
 
 class NNTPError(Exception):
@@ -59,6 +129,24 @@ class NNTPDataError(NNTPError):
     pass
 
 
+class NNTPConnectionError(NNTPError, ConnectionError):
+    """Exception for a connection closed by the server"""
+    pass
+
+
+class NNTPPostUnconfirmedError(NNTPConnectionError):
+    """Exception for a connection lost after an article was sent but before
+    the server confirmed it; the article may or may not have been accepted"""
+    pass
+
+
+# Exception raised for each failing response category
+_ERROR_CLASSES = {
+    4: NNTPTemporaryError,
+    5: NNTPPermanentError,
+}
+
+
 class CustomNNTPClient:
     """
     Custom NNTP client to replace deprecated nntplib.
@@ -66,22 +154,30 @@ class CustomNNTPClient:
     Implements the subset of nntplib functionality needed by filter_manager.py
     """
 
-    def __init__(self, host: str, port: int = 119, timeout: int = 30):
+    def __init__(self, host: str, port: int = 119, timeout: int = 30,
+                 source_address: Optional[Tuple[str, int]] = None):
         """Initialize NNTP client"""
         self.host = host
         self.port = port
         self.timeout = timeout
+        # Optional (host, port) to bind the local end of the connection to
+        self.source_address = source_address
         self.sock = None
-        self.file = None
+        # Bytes received from the server but not yet consumed
+        self._rbuf = bytearray()
+        # Fixed buffer the socket receives into, reused for every read
+        self._rview = memoryview(bytearray(_RECV_SIZE))
         self.debugging = 0
         self.welcome = None
         self.authenticated = False
+        # Maximum number of pipelined commands awaiting a response
+        self.pipelining_depth = 5
 
     def connect(self) -> NNTPResponse:
         """Connect to NNTP server"""
         try:
-            self.sock = socket.create_connection((self.host, self.port), self.timeout)
-            self.file = self.sock.makefile('rb')
+            self.sock = self._create_socket()
+            self._rbuf = bytearray()
 
             # Read welcome message
             self.welcome = self._getresp()
@@ -90,6 +186,22 @@ class CustomNNTPClient:
         except socket.error as e:
             raise NNTPError(f"Could not connect to {self.host}:{self.port} - {e}")
 
+    def _create_socket(self) -> socket.socket:
+        """Open the TCP connection to the server"""
+        sock = socket.create_connection((self.host, self.port), self.timeout,
+                                        self.source_address)
+        # Commands and articles go out as whole writes, so don't let Nagle
+        # hold them back waiting for the previous response's ACK
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        # Detect a silently dropped connection during long idle stretches
+        # (e.g. while filters run) instead of hanging on the next read
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        for name, value in _KEEPALIVE_OPTIONS:
+            if hasattr(socket, name):
+                sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, name), value)
+        return sock
+
     def _putline(self, line: str) -> None:
         """Send a line to the server"""
         if self.debugging:
@@ -98,24 +210,54 @@ class CustomNNTPClient:
         line = line + '\r\n'
         self.sock.sendall(line.encode('utf-8'))
 
+    def _putlines(self, lines: List[str]) -> None:
+        """Send several command lines to the server in a single write"""
+        if self.debugging:
+            for line in lines:
+                print(f"*cmd* {repr(line)}")
+
+        self.sock.sendall(''.join(f'{line}\r\n' for line in lines).encode('utf-8'))
+
     def _putcmd(self, line: str) -> None:
         """Send a command to the server"""
         if self.debugging:
             print(f"*cmd* {repr(line)}")
         self._putline(line)
 
-    def _getline(self) -> str:
-        """Get a line from the server"""
-        line = self.file.readline()
+    def _fill(self) -> bool:
+        """Receive more data into the read buffer; False once the server has closed"""
+        n = self.sock.recv_into(self._rview)
+        self._rbuf += self._rview[:n]
+        return n > 0
+
+    def _readline(self) -> bytes:
+        """Take one line, including its terminator, from the read buffer"""
+        scan = 0
+        while True:
+            end = self._rbuf.find(b'\n', scan)
+            if end >= 0:
+                line = bytes(self._rbuf[:end + 1])
+                del self._rbuf[:end + 1]
+                return line
+            scan = len(self._rbuf)
+            if not self._fill():
+                return b''
+
+    def _getline_bytes(self) -> bytes:
+        """Get a line from the server, without its terminator"""
+        line = self._readline()
         if not line:
-            raise NNTPError("Connection lost")
+            raise NNTPConnectionError("Connection lost")
 
         if line[-2:] == b'\r\n':
-            line = line[:-2]
-        elif line[-1:] == b'\n':
-            line = line[:-1]
+            return line[:-2]
+        if line[-1:] == b'\n':
+            return line[:-1]
+        return line
 
-        line_str = line.decode('utf-8', errors='replace')
+    def _getline(self) -> str:
+        """Get a line from the server"""
+        line_str = self._getline_bytes().decode('utf-8', errors='replace')
         if self.debugging:
             print(f"*get* {repr(line_str)}")
 
@@ -123,35 +265,30 @@ class CustomNNTPClient:
 
     def _getresp(self) -> NNTPResponse:
         """Get a response from the server"""
-        resp = self._getline()
+        line = self._getline_bytes()
         if self.debugging:
-            print(f"*resp* {repr(resp)}")
+            print(f"*resp* {repr(line)}")
 
-        # Parse response code and message
-        try:
-            code = int(resp[:3])
-            message = resp[4:] if len(resp) > 3 else ""
-        except ValueError:
-            raise NNTPDataError(f"Invalid response format: {resp}")
+        # Parse the status code straight from the bytes; only the message
+        # text needs decoding
+        if not line[:3].isdigit():
+            raise NNTPDataError(f"Invalid response format: {line.decode('utf-8', errors='replace')}")
+        category = line[0] - 48
+        code = category * 100 + (line[1] - 48) * 10 + (line[2] - 48)
+        message = line[4:].decode('utf-8', errors='replace')
 
-        return NNTPResponse(code, message)
+        return NNTPResponse(code, message, category=category)
 
     def _check_resp(self, resp: NNTPResponse, expected_codes: List[int] = None) -> NNTPResponse:
         """Check response code and raise appropriate exception if error"""
-        # Raise appropriate exception based on response code
-        if resp.code >= 500:
-            raise NNTPPermanentError(resp)
-        elif resp.code >= 400:
-            raise NNTPTemporaryError(resp)
+        # Raise appropriate exception based on response category
+        error_class = _ERROR_CLASSES.get(resp.category)
+        if error_class:
+            raise error_class(resp)
 
         # If specific codes expected, verify
         if expected_codes and resp.code not in expected_codes:
-            if resp.code >= 500:
-                raise NNTPPermanentError(resp)
-            elif resp.code >= 400:
-                raise NNTPTemporaryError(resp)
-            else:
-                raise NNTPReplyError(resp)
+            raise NNTPReplyError(resp)
 
         return resp
 
@@ -159,28 +296,61 @@ class CustomNNTPClient:
         """Get a multi-line response from the server"""
         resp = self._getresp()
 
-        lines = []
+        # Error responses are a single line with no data block
+        if resp.category >= 4:
+            self._check_resp(resp)
+
+        return resp, self._getlongdata()
+
+    def _find_terminator(self, scan: int) -> Optional[Tuple[int, int]]:
+        """Locate the '.' line ending a data block in the read buffer
+
+        Returns (data_end, block_end) offsets, or None if the terminating
+        line has not been received yet. Searching starts at scan.
+        """
+        buf = self._rbuf
+        if buf.startswith(b'.\r\n'):
+            return 0, 3
+        if buf.startswith(b'.\n'):
+            return 0, 2
+
+        crlf = buf.find(b'\n.\r\n', scan)
+        lf = buf.find(b'\n.\n', scan, crlf if crlf >= 0 else len(buf))
+        if lf >= 0:
+            return lf + 1, lf + 3
+        if crlf >= 0:
+            return crlf + 1, crlf + 4
+        return None
+
+    def _getlongdata(self) -> List[bytes]:
+        """Read the data block of a multi-line response, up to the final '.'"""
+        # Buffer until the terminating line arrives, rescanning only the
+        # newly received bytes (plus enough overlap for a split terminator)
+        scan = 0
         while True:
-            line = self.file.readline()
-            if not line:
-                raise NNTPError("Connection lost during multi-line response")
-
-            if line == b'.\r\n' or line == b'.\n':
+            found = self._find_terminator(scan)
+            if found:
                 break
-
-            # Handle byte-stuffing (lines starting with '.' are escaped as '..')
-            if line.startswith(b'..'):
-                line = line[1:]
-
-            # Remove trailing CRLF but keep the line as bytes
-            if line.endswith(b'\r\n'):
-                line = line[:-2]
-            elif line.endswith(b'\n'):
-                line = line[:-1]
-
-            lines.append(line)
-
-        return resp, lines
+            scan = max(0, len(self._rbuf) - 4)
+            if not self._fill():
+                raise NNTPConnectionError("Connection lost during multi-line response")
+
+        data_end, block_end = found
+        data = bytes(self._rbuf[:data_end])
+        del self._rbuf[:block_end]
+        if not data:
+            return []
+
+        # Handle byte-stuffing (lines starting with '.' are escaped as '..')
+        if data.startswith(b'..'):
+            data = data[1:]
+        data = data.replace(b'\n..', b'\n.')
+
+        # Split into lines without their CRLF, keeping them as bytes; the
+        # per-line path is only needed for servers sending bare LF endings
+        if data.count(b'\n') == data.count(b'\r\n'):
+            return data[:-2].split(b'\r\n')
+        return [line[:-1] if line.endswith(b'\r') else line for line in data[:-1].split(b'\n')]
 
     def _shortcmd(self, line: str) -> NNTPResponse:
         """Send a command and get a single-line response"""
@@ -192,6 +362,26 @@ class CustomNNTPClient:
         self._putcmd(line)
         return self._getlongresp()
 
+    def _pipeline_longcmd(self, lines: List[str]) -> Iterator[Tuple[NNTPResponse, Optional[List[bytes]]]]:
+        """Send commands with multi-line responses, pipelined (RFC 3977 3.5)
+
+        Up to pipelining_depth commands are kept outstanding and responses
+        are yielded in command order. An error response has no data block
+        and is yielded with None instead of raising, so the remaining
+        responses stay in step. The iterator must be consumed fully (or the
+        connection dropped) before the next command is sent.
+        """
+        sent = received = 0
+        while received < len(lines):
+            if sent < len(lines) and sent - received < self.pipelining_depth:
+                end = min(len(lines), received + self.pipelining_depth)
+                self._putlines(lines[sent:end])
+                sent = end
+
+            resp = self._getresp()
+            received += 1
+            yield resp, (self._getlongdata() if resp.code < 400 else None)
+
     def login(self, username: str, password: str) -> None:
         """Authenticate with the NNTP server"""
         # Send username
@@ -242,12 +432,29 @@ class CustomNNTPClient:
             raise NNTPReplyError(resp)
 
         # Return in format compatible with nntplib
-        class ArticleInfo:
-            def __init__(self, lines):
-                self.lines = lines
-
         return resp, ArticleInfo(lines)
 
+    def _iter_retrieve(self, command: str, ok_code: int,
+                       message_specs: Iterable[Any]) -> Iterator[Tuple[Any, NNTPResponse, Optional[List[bytes]]]]:
+        """Send command for each message spec, pipelined
+
+        Yields (message_spec, response, lines) in order; lines is None when
+        the server did not return the article (e.g. 423/430). As with
+        _pipeline_longcmd, the iterator must be consumed fully.
+        """
+        specs = list(message_specs)
+        responses = self._pipeline_longcmd([f'{command} {spec}' for spec in specs])
+        for spec, (resp, lines) in zip(specs, responses):
+            yield spec, resp, (lines if resp.code == ok_code else None)
+
+    def iter_articles(self, message_specs: Iterable[Any]) -> Iterator[Tuple[Any, NNTPResponse, Optional[List[bytes]]]]:
+        """Retrieve several articles, pipelining the ARTICLE commands"""
+        return self._iter_retrieve('ARTICLE', 220, message_specs)
+
+    def iter_heads(self, message_specs: Iterable[Any]) -> Iterator[Tuple[Any, NNTPResponse, Optional[List[bytes]]]]:
+        """Retrieve the headers of several articles, pipelining the HEAD commands"""
+        return self._iter_retrieve('HEAD', 221, message_specs)
+
     def head(self, message_spec: str) -> Tuple[NNTPResponse, Any]:
         """Retrieve article headers"""
         resp, lines = self._longcmd(f'HEAD {message_spec}')
@@ -256,10 +463,6 @@ class CustomNNTPClient:
             raise NNTPReplyError(resp)
 
         # Return in format compatible with nntplib
-        class HeaderInfo:
-            def __init__(self, lines):
-                self.lines = lines
-
         return resp, HeaderInfo(lines)
 
     def post(self, data: bytes) -> NNTPResponse:
@@ -272,19 +475,22 @@ class CustomNNTPClient:
             self._check_resp(resp, [340])
 
         # Send article data
-        # Data should already be properly formatted with headers and body
-        lines = data.split(b'\n')
-        for line in lines:
-            # Byte-stuff lines starting with '.'
-            if line.startswith(b'.'):
-                line = b'.' + line
-            self.sock.sendall(line + b'\r\n')
-
-        # Send termination sequence
-        self.sock.sendall(b'.\r\n')
+        # Data should already be properly formatted with headers and body.
+        # Normalize line endings, byte-stuff lines starting with '.', and
+        # send the article and its terminator in a single write
+        payload = data.replace(b'\r\n', b'\n').replace(b'\n.', b'\n..')
+        if payload.startswith(b'.'):
+            payload = b'.' + payload
+
+        # Once the article starts going out, a lost connection no longer
+        # means it was not posted, so callers must not simply retry
+        try:
+            self.sock.sendall(payload.replace(b'\n', b'\r\n') + b'\r\n.\r\n')
 
-        # Get response
-        resp = self._getresp()
+            # Get response
+            resp = self._getresp()
+        except OSError as e:
+            raise NNTPPostUnconfirmedError(f"Connection lost while posting - {e}") from e
         if resp.code != 240:
             self._check_resp(resp, [240])
 
@@ -297,29 +503,7 @@ class CustomNNTPClient:
         if resp.code != 224:
             self._check_resp(resp, [224])
 
-        # Parse overview data
-        # Format: article_num <tab> subject <tab> from <tab> date <tab> message-id <tab> references <tab> bytes <tab> lines
-        overview_data = []
-        for line in lines:
-            line_str = line.decode('utf-8', errors='replace')
-            parts = line_str.split('\t')
-            if len(parts) >= 8:
-                try:
-                    article_num = int(parts[0])
-                    overview_data.append((
-                        article_num,
-                        parts[1],  # subject
-                        parts[2],  # from
-                        parts[3],  # date
-                        parts[4],  # message-id
-                        parts[5],  # references
-                        int(parts[6]) if parts[6].isdigit() else 0,  # bytes
-                        int(parts[7]) if parts[7].isdigit() else 0   # lines
-                    ))
-                except (ValueError, IndexError):
-                    continue
-
-        return resp, overview_data
+        return resp, _parse_overview(lines)
 
     def xover(self, start: int, end: int) -> Tuple[NNTPResponse, List[Tuple]]:
         """Get overview information for articles (XOVER command - older servers)"""
@@ -334,27 +518,7 @@ class CustomNNTPClient:
                 self._check_resp(resp, [224])
 
             # Parse same as over()
-            overview_data = []
-            for line in lines:
-                line_str = line.decode('utf-8', errors='replace')
-                parts = line_str.split('\t')
-                if len(parts) >= 8:
-                    try:
-                        article_num = int(parts[0])
-                        overview_data.append((
-                            article_num,
-                            parts[1],  # subject
-                            parts[2],  # from
-                            parts[3],  # date
-                            parts[4],  # message-id
-                            parts[5],  # references
-                            int(parts[6]) if parts[6].isdigit() else 0,  # bytes
-                            int(parts[7]) if parts[7].isdigit() else 0   # lines
-                        ))
-                    except (ValueError, IndexError):
-                        continue
-
-            return resp, overview_data
+            return resp, _parse_overview(lines)
 
     def list(self, group_pattern: str = None) -> Tuple[NNTPResponse, List[Tuple]]:
         """List newsgroups"""
@@ -392,17 +556,23 @@ class CustomNNTPClient:
         except:
             resp = None
 
-        if self.file:
-            self.file.close()
+        self.close()
+        return resp
+
+    def close(self) -> None:
+        """Close the connection without sending QUIT
+
+        For a connection that timed out or has pipelined responses still in
+        flight, where waiting for the QUIT reply would block or read a stale
+        response.
+        """
         if self.sock:
             self.sock.close()
 
-        self.file = None
         self.sock = None
+        self._rbuf = bytearray()
         self.authenticated = False
 
-        return resp
-
     def __enter__(self):
         return self
 
@@ -414,19 +584,30 @@ class CustomNNTP_SSL(CustomNNTPClient):
     """SSL version of the custom NNTP client"""
 
     def __init__(self, host: str, port: int = 563, timeout: int = 30,
-                 context: ssl.SSLContext = None):
-        super().__init__(host, port, timeout)
-        self.context = context or ssl.create_default_context()
+                 context: ssl.SSLContext = None,
+                 source_address: Optional[Tuple[str, int]] = None):
+        super().__init__(host, port, timeout, source_address)
+        self.context = context or _default_ssl_context()
+        # Sessions only resume with the context that created them, so a
+        # caller-supplied context keeps its own for this client
+        self._sessions = _ssl_sessions if context is None else {}
 
     def connect(self) -> NNTPResponse:
         """Connect to NNTP server with SSL"""
         try:
-            sock = socket.create_connection((self.host, self.port), self.timeout)
-            self.sock = self.context.wrap_socket(sock, server_hostname=self.host)
-            self.file = self.sock.makefile('rb')
+            key = (self.host, self.port)
+            sock = self._create_socket()
+            self.sock = self.context.wrap_socket(sock, server_hostname=self.host,
+                                                 session=self._sessions.get(key))
+            self._rbuf = bytearray()
 
             # Read welcome message
             self.welcome = self._getresp()
+
+            # TLS 1.3 tickets arrive after the handshake, so pick up the
+            # session once the welcome has been read
+            if self.sock.session is not None:
+                self._sessions[key] = self.sock.session
             return self.welcome
 
         except socket.error as e:
@@ -448,5 +629,9 @@ __all__ = [
     'NNTPTemporaryError',
     'NNTPReplyError',
     'NNTPDataError',
-    'NNTPResponse'
+    'NNTPConnectionError',
+    'NNTPPostUnconfirmedError',
+    'NNTPResponse',
+    'ArticleInfo',
+    'HeaderInfo'
 ]
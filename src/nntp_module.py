@@ -7,7 +7,6 @@ Handles NNTP server communication for the gateway
 import os
 import time
 import re
-import socket
 import email
 from email.utils import parseaddr, formataddr, parsedate_to_datetime
 from email.header import decode_header
@@ -21,7 +20,7 @@ from .nntp_client import (
     CustomNNTP_SSL as NNTP_SSL,
     NNTPError,
     NNTPPermanentError,
-    NNTPTemporaryError
+    NNTPPostUnconfirmedError
 )
 
 
@@ -31,6 +30,8 @@ class NNTPModule:
     def __init__(self, config, logger):
         self.config = config
         self.logger = logger
+        # One authenticated session serves every fetch/post/list of a run and
+        # is only replaced after a connection error
         self.connection = None
 
     def connect(self) -> bool:
@@ -77,11 +78,18 @@ class NNTPModule:
             self.connection = None
             return False
 
-    def disconnect(self):
-        """Disconnect from NNTP server"""
+    def disconnect(self, send_quit: bool = True):
+        """Disconnect from NNTP server
+
+        Pass send_quit=False when the connection timed out or is out of step
+        with the server, so no QUIT reply is waited for.
+        """
         if self.connection:
             try:
-                self.connection.quit()
+                if send_quit:
+                    self.connection.quit()
+                else:
+                    self.connection.close()
                 self.logger.info("Disconnected from NNTP server")
             except:
                 pass
@@ -90,15 +98,66 @@ class NNTPModule:
 
     def post_message(self, message: Dict[str, Any]) -> bool:
         """Post a message to NNTP server"""
+        return self.post_messages([message])[0]
+
+    def post_messages(self, messages: List[Dict[str, Any]]) -> List[bool]:
+        """Post a batch of messages over one connection, returning per-message success
+
+        POST cannot be pipelined (the article may only be sent after the 340
+        reply), so the saving comes from reusing the connection and only
+        issuing GROUP when the target newsgroup changes.
+        """
+        if not messages:
+            return []
+
         if not self.connection and not self.connect():
-            return False
+            return [False] * len(messages)
 
+        results = []
+        selected_group = None
+        for message in messages:
+            try:
+                success, selected_group = self._post_article(message, selected_group)
+            except NNTPPostUnconfirmedError as e:
+                # The server may already have accepted the article, so retrying
+                # could post it twice: count it failed, reconnect for the next
+                self.logger.error(f"Error posting message, server may have accepted it: {e}")
+                results.append(False)
+                self.disconnect()
+                if not self.connect():
+                    results.extend([False] * (len(messages) - len(results)))
+                    break
+                selected_group = None
+                continue
+            except (OSError, EOFError) as e:
+                # The server may drop a connection left idle between batches:
+                # reconnect once and retry this article, which was not sent yet
+                self.logger.warning(f"NNTP connection lost ({type(e).__name__}: {e}), reconnecting")
+                self.disconnect()
+                if not self.connect():
+                    results.extend([False] * (len(messages) - len(results)))
+                    break
+                try:
+                    success, selected_group = self._post_article(message, None)
+                except (OSError, EOFError) as e:
+                    self.logger.error(f"Error posting message after reconnect: {e}")
+                    success, selected_group = False, None
+            results.append(success)
+
+        return results
+
+    def _post_article(self, message: Dict[str, Any], selected_group: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """Post one message; returns (success, currently selected newsgroup)
+
+        Connection errors (OSError, including a connection closed by the
+        server) are raised so post_messages can reconnect.
+        """
         try:
             # Get newsgroup from area mapping
             newsgroup = self.get_newsgroup_for_area(message.get('area', ''))
             if not newsgroup:
                 self.logger.error(f"No newsgroup mapping for area: {message.get('area', '')}")
-                return False
+                return False, selected_group
 
             # Build NNTP article
             article_lines = self.build_nntp_article(message, newsgroup)
@@ -111,18 +170,25 @@ class NNTPModule:
             self.logger.info(f"Posting message to {newsgroup}: {message.get('subject', 'No Subject')}")
 
             try:
-                self.connection.group(newsgroup)  # Select newsgroup
+                if newsgroup != selected_group:
+                    self.connection.group(newsgroup)  # Select newsgroup
+                    selected_group = newsgroup
                 resp = self.connection.post(article_text.encode('utf-8'))
                 self.logger.info(f"Message posted successfully: {resp}")
-                return True
+                return True, selected_group
 
+            except (OSError, EOFError):
+                # Connection problem: let post_messages reconnect
+                raise
             except NNTPError as e:
                 self.logger.error(f"Failed to post message: {e}")
-                return False
+                return False, None
 
+        except (OSError, EOFError):
+            raise
         except Exception as e:
             self.logger.error(f"Error posting message: {e}")
-            return False
+            return False, None
 
     def get_current_last_article(self, newsgroup: str) -> Optional[int]:
         """Get the current highest article number for a newsgroup"""
@@ -172,77 +238,58 @@ class NNTPModule:
                 fetch_limit = min(100, last_num - start_article + 1)
                 end_article = min(start_article + fetch_limit - 1, last_num)
 
-            # Fetch articles
+            # Fetch articles; ARTICLE commands are pipelined and the
+            # responses come back in order
             failed_articles = []
+            next_article = start_article
             connection_error_count = 0
-            max_connection_errors = 3  # Reconnect after this many consecutive connection errors
+            max_connection_errors = 3  # Give up after this many consecutive reconnects
 
-            for article_num in range(start_article, end_article + 1):
+            while next_article <= end_article:
                 try:
-                    resp, article_info = self.connection.article(str(article_num))
-                    lines = article_info.lines
-
-                    # Parse article
-                    message = self.parse_nntp_article(lines, newsgroup, article_num)
-                    if message:
-                        messages.append(message)
-                        self.logger.debug(f"Fetched article {article_num}: {message.get('subject', 'No Subject')}")
-                    connection_error_count = 0  # Reset on success
-
-                except NNTPTemporaryError as e:
-                    # Article doesn't exist (430/423 error), skip but log
-                    self.logger.debug(f"Article {article_num} not available: {e}")
-                    continue
-                except (TimeoutError, socket.timeout) as e:
-                    # Timeout error - connection may be broken
-                    self.logger.error(f"Timeout fetching article {article_num} from {newsgroup}: {e}")
-                    failed_articles.append(article_num)
-                    connection_error_count += 1
-
-                    # Try to reconnect after repeated connection errors
-                    if connection_error_count >= max_connection_errors:
-                        self.logger.warning(f"Multiple connection errors, attempting reconnect to {newsgroup}")
-                        self.disconnect()
-                        if self.connect():
-                            # Reselect the newsgroup after reconnecting
-                            try:
-                                self.connection.group(newsgroup)
-                                connection_error_count = 0
-                                self.logger.info(f"Reconnected successfully, continuing fetch from article {article_num + 1}")
-                            except Exception as reconnect_e:
-                                self.logger.error(f"Failed to reselect {newsgroup} after reconnect: {reconnect_e}")
-                                break  # Give up on this newsgroup
-                        else:
-                            self.logger.error(f"Reconnect failed, aborting fetch for {newsgroup}")
-                            break  # Give up on this newsgroup
-                    continue
-                except (OSError, ConnectionError, BrokenPipeError) as e:
-                    # Connection broken - need to reconnect
-                    self.logger.error(f"Connection error fetching article {article_num} from {newsgroup}: {type(e).__name__}: {e}")
-                    failed_articles.append(article_num)
+                    for article_num, resp, lines in self.connection.iter_articles(range(next_article, end_article + 1)):
+                        next_article = article_num + 1
+                        connection_error_count = 0
+
+                        if lines is None:
+                            # Article doesn't exist (430/423 error), skip but log
+                            self.logger.debug(f"Article {article_num} not available: {resp.code} {resp.message}")
+                            continue
+
+                        try:
+                            # Parse article
+                            message = self.parse_nntp_article(lines, newsgroup, article_num)
+                        except Exception as e:
+                            # The connection is still in step, so just skip it
+                            self.logger.error(f"Error fetching article {article_num} from {newsgroup}: {type(e).__name__}: {e}")
+                            failed_articles.append(article_num)
+                            continue
+
+                        if message:
+                            messages.append(message)
+                            self.logger.debug(f"Fetched article {article_num}: {message.get('subject', 'No Subject')}")
+
+                except (OSError, NNTPError) as e:
+                    # Connection broken or timed out, or the protocol is out of
+                    # step; responses to pipelined commands may still be in
+                    # flight, so reconnect
+                    self.logger.error(f"Connection error fetching article {next_article} from {newsgroup}: {type(e).__name__}: {e}")
+                    failed_articles.append(next_article)
+                    next_article += 1
                     connection_error_count += 1
-
-                    # Try to reconnect
                     if connection_error_count >= max_connection_errors:
-                        self.logger.warning(f"Connection broken, attempting reconnect to {newsgroup}")
-                        self.disconnect()
-                        if self.connect():
-                            try:
-                                self.connection.group(newsgroup)
-                                connection_error_count = 0
-                                self.logger.info(f"Reconnected successfully, continuing fetch from article {article_num + 1}")
-                            except Exception as reconnect_e:
-                                self.logger.error(f"Failed to reselect {newsgroup} after reconnect: {reconnect_e}")
-                                break
-                        else:
-                            self.logger.error(f"Reconnect failed, aborting fetch for {newsgroup}")
-                            break
-                    continue
+                        self.logger.error(f"Multiple connection errors, aborting fetch for {newsgroup}")
+                        self.disconnect(send_quit=False)
+                        break
+                    if not self._reconnect_group(newsgroup, next_article):
+                        break  # Give up on this newsgroup
                 except Exception as e:
-                    # Other errors - log with full details but continue
-                    self.logger.error(f"Error fetching article {article_num} from {newsgroup}: {type(e).__name__}: {e}")
-                    failed_articles.append(article_num)
-                    continue
+                    # Anything else leaves the pipeline in an unknown state;
+                    # drop the connection and let the next fetch reconnect
+                    self.logger.error(f"Error fetching article {next_article} from {newsgroup}: {type(e).__name__}: {e}")
+                    failed_articles.append(next_article)
+                    self.disconnect(send_quit=False)
+                    break
 
             # Log fetch results with context
             if is_new_newsgroup:
@@ -263,6 +310,27 @@ class NNTPModule:
 
         return messages
 
+    def _reconnect_group(self, newsgroup: str, next_article: int) -> bool:
+        """Reconnect and reselect newsgroup after a failed fetch
+
+        Responses to pipelined commands may still be in flight after an
+        error, so the connection is always replaced rather than reused.
+        """
+        self.logger.warning(f"Connection broken, attempting reconnect to {newsgroup}")
+        self.disconnect(send_quit=False)
+        if not self.connect():
+            self.logger.error(f"Reconnect failed, aborting fetch for {newsgroup}")
+            return False
+
+        try:
+            self.connection.group(newsgroup)
+        except Exception as reconnect_e:
+            self.logger.error(f"Failed to reselect {newsgroup} after reconnect: {reconnect_e}")
+            return False
+
+        self.logger.info(f"Reconnected successfully, continuing fetch from article {next_article}")
+        return True
+
     def parse_nntp_article(self, lines: List[bytes], newsgroup: str, article_num: int) -> Optional[Dict[str, Any]]:
         """Parse NNTP article into message dict"""
         try:
@@ -134,16 +134,26 @@ class SpamFilterModule:
 
     def is_spam(self, message: Dict[str, Any]) -> bool:
         """Check if message is spam using all enabled filters"""
-        self.stats['total_checked'] += 1
+        return self.is_spam_batch([message])[0]
+
+    def is_spam_batch(self, messages: List[Dict[str, Any]]) -> List[bool]:
+        """Check a batch of messages, returning one spam flag per message
+
+        The enabled setting and the active filter list are resolved once
+        for the whole batch rather than once per message.
+        """
+        self.stats['total_checked'] += len(messages)
 
         # Skip filtering if disabled
         if not self.config.getboolean('SpamFilter', 'enabled'):
-            return False
+            return [False] * len(messages)
 
-        for filter_entry in self.filters:
-            if not filter_entry['enabled']:
-                continue
+        active_filters = [filter_entry for filter_entry in self.filters if filter_entry['enabled']]
+        return [self._run_filters(message, active_filters) for message in messages]
 
+    def _run_filters(self, message: Dict[str, Any], active_filters: List[Dict[str, Any]]) -> bool:
+        """Run enabled filters against one message until one flags it as spam"""
+        for filter_entry in active_filters:
             try:
                 filter_entry['stats']['checked'] += 1
 